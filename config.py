@@ -26,10 +26,16 @@ load_dotenv()
 REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
 REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
 REDIS_DB = int(os.getenv('REDIS_DB', 0))
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 64))  # Shared pool size for the interface server
+REDIS_POOL_TIMEOUT = 2  # Seconds to wait for a free pooled connection (and to connect)
 
 # Server Configuration
 INTERFACE_SERVER_HOST = '0.0.0.0'
 INTERFACE_SERVER_PORT = 5001
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024  # Largest accepted image
+# Largest accepted request body (room for several pages on /api/process-comics); bigger
+# uploads are refused from the Content-Length header before the body is read
+MAX_REQUEST_BYTES = int(os.getenv('MAX_REQUEST_BYTES', 100 * 1024 * 1024))
 
 # Queue Names
 QUEUE_DEFAULT = 'default'
@@ -40,6 +46,10 @@ QUEUE_TTS = 'tts'
 JOB_TIMEOUT = '10m'  # Maximum time a job can run
 JOB_RESULT_TTL = 3600  # How long to keep job results (1 hour)
 JOB_FAILURE_TTL = 86400  # How long to keep failed job info (24 hours)
+JOB_EVENTS_CHANNEL_PREFIX = 'comic:job-events:'  # Workers publish on <prefix><job_id> when a job's status changes
+JOB_EVENTS_KEEPALIVE_SECONDS = 15  # SSE keepalive (and status re-check) interval
+JOB_STATUS_MAX_WAIT_SECONDS = 30  # Longest a /api/job-status long-poll (?wait=) is held open
+JOB_STATUS_BATCH_MAX = 100  # Most job ids accepted by one /api/job-status-batch request
 
 # Worker Configuration
 WORKER_COUNT = int(os.getenv('WORKER_COUNT', 2))  # Number of workers to start
@@ -55,6 +65,11 @@ USE_LLM_NARRATOR = os.getenv('USE_LLM_NARRATOR', 'true').lower() == 'true'  # Se
 AUDIO_DIR = 'audio_files'
 TEMP_DIR = 'temp_images'
 FILE_CLEANUP_AGE_HOURS = 1  # Remove files older than this
+# Internal nginx location aliased to the audio directory (e.g. /internal-audio/); when set,
+# audio downloads are handed to nginx via X-Accel-Redirect instead of streamed by Flask
+AUDIO_ACCEL_REDIRECT_PREFIX = os.getenv('AUDIO_ACCEL_REDIRECT_PREFIX')
+# Behind Apache (mod_xsendfile) or lighttpd, hand audio downloads over via X-Sendfile instead
+USE_X_SENDFILE = os.getenv('USE_X_SENDFILE', 'false').lower() == 'true'
 
 # Logging
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -7,6 +7,16 @@ import os
 import subprocess
 import sentencepiece as spm
 
+
+def gpu_device():
+    """OpenNMT -gpu value: the first CUDA device if there is one, else -1 (CPU)"""
+    try:
+        import torch
+        return "0" if torch.cuda.is_available() else "-1"
+    except ImportError:
+        return "-1"
+
+
 def main():
     print("NEURAL MACHINE TRANSLATION - STEP 22000 MODEL")
     print("=" * 60)
@@ -56,8 +66,8 @@ def main():
         print("\nStep 1: BPE encoding...")
         # Encode input with BPE
         with open(bpe_input, "w", encoding="utf-8") as fout:
-            for sentence in sentences:
-                encoded = sp.encode(sentence, out_type=str)
+            # One call for all sentences: the loop runs inside SentencePiece, not Python
+            for encoded in sp.encode(sentences, out_type=str):
                 fout.write(" ".join(encoded) + "\n")
         print("SUCCESS: BPE encoding completed!")
         
@@ -70,7 +80,8 @@ def main():
             "-src", bpe_input,
             "-output", bpe_output,
             "-replace_unk",
-            "-gpu", "-1"
+            "-gpu", gpu_device(),
+            "-batch_size", "64"  # sentences decoded together
         ]
 
         print(f"Running: {' '.join(cmd)}")
@@ -91,15 +102,19 @@ def main():
         print(f"Found {len(bpe_lines)} translated lines")
         
         # Decode BPE to get final translations
-        decoded_sentences = []
-        for bpe_line in bpe_lines:
-            if bpe_line:
-                try:
-                    decoded = sp.decode(bpe_line.split())
-                    decoded_sentences.append(decoded)
-                except Exception as e:
-                    print(f"Warning: Could not decode line: {bpe_line[:50]}...")
-                    decoded_sentences.append(f"[Decode error: {str(e)}]")
+        try:
+            decoded_sentences = sp.decode([bpe_line.split() for bpe_line in bpe_lines])
+        except Exception:
+            # Fall back to line by line so one bad line does not lose the others
+            decoded_sentences = []
+            for bpe_line in bpe_lines:
+                if bpe_line:
+                    try:
+                        decoded = sp.decode(bpe_line.split())
+                        decoded_sentences.append(decoded)
+                    except Exception as e:
+                        print(f"Warning: Could not decode line: {bpe_line[:50]}...")
+                        decoded_sentences.append(f"[Decode error: {str(e)}]")
         
         # Save results
         with open(final_output, "w", encoding="utf-8") as fout:
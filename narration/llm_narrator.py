@@ -5,16 +5,38 @@ Generates audiobook-style narration from comic images while preserving dialogue
 
 import os
 import base64
+import hashlib
+import json
 import logging
-from typing import Dict, List, Optional, Any
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Dict, List, Optional, Any, Tuple
 from openai import OpenAI
 from io import BytesIO
 from PIL import Image
+from webutil import remove_old_files
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Part of every narration cache key: bump whenever a prompt changes so cached
+# narrations made with the old wording are not reused
+PROMPT_VERSION = 1
+
+# Expired narration cache files are swept from cache_dir at most this often per narrator
+CACHE_SWEEP_INTERVAL_SECONDS = 60 * 60
+
+# Leading bytes of the image formats uploads may use, for the data URL's MIME type
+_IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
 
 class ComicNarrator:
     """
@@ -22,13 +44,25 @@ class ComicNarrator:
     Preserves original dialogue while adding narrative context.
     """
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o"):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4o",
+        cache_dir: Optional[str] = None,
+        cache_size: int = 256,
+        cache_max_age_hours: Optional[float] = None
+    ):
         """
         Initialize the Comic Narrator.
 
         Args:
             api_key: OpenAI API key. If None, will try to get from environment.
             model: OpenAI model to use (default: gpt-4o which has vision capabilities)
+            cache_dir: Directory for cached narrations shared between processes. If None,
+                uses NARRATOR_CACHE_DIR from the environment (unset: memory cache only).
+            cache_size: Number of narrations kept in the in-memory cache
+            cache_max_age_hours: Age after which cache_dir files expire. If None, uses
+                NARRATOR_CACHE_MAX_AGE_HOURS from the environment (default: one week).
         """
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         if not self.api_key:
@@ -36,8 +70,106 @@ class ComicNarrator:
 
         self.model = model
         self.client = OpenAI(api_key=self.api_key)
+
+        self.cache_dir = cache_dir or os.getenv('NARRATOR_CACHE_DIR')
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        self.cache_size = cache_size
+        if cache_max_age_hours is None:
+            cache_max_age_hours = float(os.getenv('NARRATOR_CACHE_MAX_AGE_HOURS', 7 * 24))
+        self.cache_max_age = cache_max_age_hours * 3600
+        self._last_cache_sweep = None
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = Lock()
         logger.info(f"ComicNarrator initialized with model: {model}")
 
+    def _cache_key(self, kind: str, image_bytes: bytes, *params: Any) -> str:
+        """
+        Key for a narration: the image content plus everything that shapes the prompt.
+
+        Args:
+            kind: Which narration method produced the result
+            image_bytes: Raw image bytes
+            params: Prompt parameters (panel position, token limit)
+
+        Returns:
+            Hex digest identifying the narration
+        """
+        digest = hashlib.blake2b(image_bytes, digest_size=16)
+        digest.update(f"|{kind}|{self.model}|{PROMPT_VERSION}|{params}".encode())
+        return digest.hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached narration in memory, then on disk.
+
+        Args:
+            key: Key from _cache_key
+
+        Returns:
+            The cached result (marked cached, no tokens used), or None on a miss
+        """
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+
+        if result is None and self.cache_dir:
+            path = os.path.join(self.cache_dir, f"{key}.json")
+            try:
+                if os.path.getmtime(path) < time.time() - self.cache_max_age:
+                    return None  # Expired; removed by the next sweep
+                with open(path, encoding='utf-8') as f:
+                    result = json.load(f)
+            except (OSError, ValueError):
+                return None
+            self._cache_put(key, result, write_disk=False)
+
+        if result is None:
+            return None
+        return {**result, "tokens_used": 0, "cached": True}
+
+    def _cache_put(self, key: str, result: Dict[str, Any], write_disk: bool = True) -> None:
+        """
+        Store a successful narration in memory and, if configured, on disk.
+
+        Args:
+            key: Key from _cache_key
+            result: Narration result; the raw API response is not stored
+            write_disk: Also write the result to cache_dir
+        """
+        entry = {k: v for k, v in result.items() if k != "cached"}
+        if "raw_response" in entry:
+            entry["raw_response"] = None  # API response objects are not serializable
+        with self._cache_lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        if write_disk and self.cache_dir:
+            path = os.path.join(self.cache_dir, f"{key}.json")
+            try:
+                # Write then rename, so concurrent readers never see a partial file
+                with open(f"{path}.{os.getpid()}.tmp", "w", encoding='utf-8') as f:
+                    json.dump(entry, f)
+                os.replace(f"{path}.{os.getpid()}.tmp", path)
+            except OSError as e:
+                logger.warning(f"Could not write narration cache entry: {e}")
+            self._sweep_disk_cache()
+
+    def _sweep_disk_cache(self) -> None:
+        """Remove expired files from cache_dir, at most once per CACHE_SWEEP_INTERVAL_SECONDS."""
+        now = time.monotonic()
+        with self._cache_lock:
+            if self._last_cache_sweep is not None and now - self._last_cache_sweep < CACHE_SWEEP_INTERVAL_SECONDS:
+                return
+            self._last_cache_sweep = now
+        try:
+            remove_old_files([self.cache_dir], self.cache_max_age)
+        except OSError as e:
+            logger.warning(f"Could not sweep narration cache: {e}")
+
     def _encode_image_to_base64(self, image_bytes: bytes) -> str:
         """
         Encode image bytes to base64 string for OpenAI API.
@@ -50,13 +182,74 @@ class ComicNarrator:
         """
         return base64.b64encode(image_bytes).decode('utf-8')
 
-    def _create_narration_prompt(self, panel_number: Optional[int] = None, total_panels: Optional[int] = None) -> str:
+    def _image_data_url(self, image_bytes: bytes) -> str:
+        """
+        Downscale an image (see _prepare_image) and build its base64 data URL.
+
+        The MIME type comes from the image's leading bytes, so PNG, GIF and WebP panels
+        are not mislabelled as JPEG; the URL is assembled as bytes and decoded once.
+
+        Args:
+            image_bytes: Raw image bytes
+
+        Returns:
+            data: URL for an image_url content part
+        """
+        image_bytes = self._prepare_image(image_bytes)
+        mime = "image/jpeg"
+        if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+            mime = "image/webp"
+        else:
+            for signature, signature_mime in _IMAGE_SIGNATURES:
+                if image_bytes.startswith(signature):
+                    mime = signature_mime
+                    break
+        return (f"data:{mime};base64,".encode('ascii') + base64.b64encode(image_bytes)).decode('ascii')
+
+    def _prepare_image(self, image_bytes: bytes) -> bytes:
+        """
+        Shrink an image to the size the vision model actually looks at.
+
+        High-detail images are scaled to fit 2048x2048 and then to 768px on the short
+        side before tiling, so larger uploads only cost bandwidth. Oversized images are
+        downscaled to those limits and re-encoded as JPEG; anything else is sent as-is.
+
+        Args:
+            image_bytes: Raw image bytes
+
+        Returns:
+            JPEG bytes of the downscaled image, or the original bytes
+        """
+        try:
+            img = Image.open(BytesIO(image_bytes))
+            width, height = img.size
+            scale = min(1.0, 2048 / max(width, height))
+            scale *= min(1.0, 768 / (min(width, height) * scale))
+            if scale >= 1.0:
+                return image_bytes
+
+            img = img.convert("RGB")
+            img.thumbnail((round(width * scale), round(height * scale)), Image.LANCZOS)
+            buf = BytesIO()
+            img.save(buf, "JPEG", quality=85, optimize=True)
+            return buf.getvalue()
+        except Exception as e:
+            logger.warning(f"Could not downscale image, sending original: {e}")
+            return image_bytes
+
+    def _create_narration_prompt(
+        self,
+        panel_number: Optional[int] = None,
+        total_panels: Optional[int] = None,
+        task: str = "Now, analyze this comic panel and create the audiobook narration:"
+    ) -> str:
         """
         Create the system prompt for audiobook-style narration.
 
         Args:
             panel_number: Current panel number (1-indexed)
             total_panels: Total number of panels
+            task: Closing instruction after the narration rules
 
         Returns:
             Formatted prompt string
@@ -86,10 +279,56 @@ IMPORTANT:
 - Make it sound natural when spoken aloud
 - If there are multiple characters speaking, indicate who is speaking through narrative context
 
-Now, analyze this comic panel and create the audiobook narration:"""
+{task}"""
 
         return prompt
 
+    def _panel_request_body(
+        self,
+        image_bytes: bytes,
+        panel_number: Optional[int] = None,
+        total_panels: Optional[int] = None,
+        max_tokens: int = 500
+    ) -> Dict[str, Any]:
+        """
+        Build the chat completion request for one panel.
+
+        Args:
+            image_bytes: Raw bytes of the panel image
+            panel_number: Current panel number (1-indexed)
+            total_panels: Total number of panels in the comic
+            max_tokens: Maximum tokens for the response
+
+        Returns:
+            Keyword arguments for chat.completions.create (also a Batch API request body)
+        """
+        # Create the prompt
+        system_prompt = self._create_narration_prompt(panel_number, total_panels)
+
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": system_prompt
+                        },
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": self._image_data_url(image_bytes),
+                                "detail": "high"
+                            }
+                        }
+                    ]
+                }
+            ],
+            "max_tokens": max_tokens,
+            "temperature": 0.7  # Slight creativity for engaging narration
+        }
+
     def narrate_panel(
         self,
         image_bytes: bytes,
@@ -113,37 +352,17 @@ Now, analyze this comic panel and create the audiobook narration:"""
                 - error: Error message if failed
                 - raw_response: Full API response
         """
-        try:
-            # Encode image to base64
-            base64_image = self._encode_image_to_base64(image_bytes)
-
-            # Create the prompt
-            system_prompt = self._create_narration_prompt(panel_number, total_panels)
+        cache_key = self._cache_key("panel", image_bytes, panel_number, total_panels, max_tokens)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"Using cached narration for panel {panel_number or 'unknown'}")
+            return cached
 
+        try:
             # Call OpenAI API
             logger.info(f"Generating narration for panel {panel_number or 'unknown'}")
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": system_prompt
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}",
-                                    "detail": "high"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=max_tokens,
-                temperature=0.7  # Slight creativity for engaging narration
+                **self._panel_request_body(image_bytes, panel_number, total_panels, max_tokens)
             )
 
             # Extract narration
@@ -151,13 +370,15 @@ Now, analyze this comic panel and create the audiobook narration:"""
 
             logger.info(f"Successfully generated narration ({len(narration)} chars)")
 
-            return {
+            result = {
                 "narration": narration,
                 "success": True,
                 "error": None,
                 "raw_response": response,
                 "tokens_used": response.usage.total_tokens if response.usage else None
             }
+            self._cache_put(cache_key, result)
+            return result
 
         except Exception as e:
             logger.error(f"Error generating narration: {str(e)}")
@@ -169,17 +390,112 @@ Now, analyze this comic panel and create the audiobook narration:"""
                 "tokens_used": None
             }
 
+    def narrate_panel_group(
+        self,
+        panel_images: List[bytes],
+        first_panel_number: int = 1,
+        total_panels: Optional[int] = None,
+        max_tokens_per_panel: int = 500
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Generate narration for several consecutive panels with a single API request.
+
+        The narration instructions are sent once for the whole group, and the model
+        returns a JSON object with one narration per image.
+
+        Args:
+            panel_images: Consecutive panel images as bytes
+            first_panel_number: Panel number (1-indexed) of the first image
+            total_panels: Total number of panels in the comic
+            max_tokens_per_panel: Response token budget per panel
+
+        Returns:
+            Tuple of (per-panel results shaped like narrate_panel's, tokens used by the request)
+        """
+        count = len(panel_images)
+        last_panel_number = first_panel_number + count - 1
+        total_panels = total_panels or last_panel_number
+
+        try:
+            prompt = self._create_narration_prompt(task=f"""You are given panels {first_panel_number} to {last_panel_number} of {total_panels}, one image per panel, in reading order. Narrate each panel separately following the rules above.
+
+Respond with a JSON object of the form {{"panels": [{{"panel": <panel number>, "narration": "<narration>"}}]}} containing exactly one entry per image, in order.""")
+
+            content = [{"type": "text", "text": prompt}]
+            for image_bytes in panel_images:
+                content.append({
+                    "type": "image_url",
+                    "image_url": {"url": self._image_data_url(image_bytes), "detail": "high"}
+                })
+
+            logger.info(f"Generating narration for panels {first_panel_number}-{last_panel_number}")
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": content}],
+                max_tokens=max_tokens_per_panel * count,
+                temperature=0.7,
+                response_format={"type": "json_object"}
+            )
+
+            entries = json.loads(response.choices[0].message.content).get("panels") or []
+            entries = [entry for entry in entries if isinstance(entry, dict)]
+
+            # Trust the model's panel numbers only if they are distinct and within this group
+            # (not 0-based or restarted); otherwise map entries to panels by position
+            expected = range(first_panel_number, last_panel_number + 1)
+            numbers = []
+            for entry in entries:
+                try:
+                    numbers.append(int(entry.get("panel")))
+                except (TypeError, ValueError):
+                    numbers.append(None)
+            if not all(n in expected for n in numbers) or len(set(numbers)) != len(numbers):
+                numbers = [first_panel_number + position for position in range(len(entries))]
+
+            narrations = {
+                panel_number: str(entry.get("narration") or "").strip()
+                for panel_number, entry in zip(numbers, entries)
+            }
+            tokens_used = response.usage.total_tokens if response.usage else 0
+            error = None
+
+        except Exception as e:
+            logger.error(f"Error generating group narration: {str(e)}")
+            narrations, tokens_used, error = {}, 0, str(e)
+
+        results = []
+        for panel_number in range(first_panel_number, last_panel_number + 1):
+            narration = narrations.get(panel_number, "")
+            results.append({
+                "narration": narration,
+                "success": bool(narration),
+                "error": None if narration else (error or "No narration returned for panel"),
+                "raw_response": None,
+                "tokens_used": None  # Tokens are reported for the whole request
+            })
+        return results, tokens_used
+
     def narrate_comic(
         self,
         panel_images: List[bytes],
-        combine_narration: bool = True
+        combine_narration: bool = True,
+        max_workers: int = 8,
+        panels_per_call: int = 1
     ) -> Dict[str, Any]:
         """
         Generate audiobook-style narration for multiple comic panels.
 
+        Panels are narrated by concurrent API requests (the client is thread-safe and
+        retries rate limits and server errors with backoff), so the wait is roughly the
+        slowest panel instead of the sum of all of them. Results stay in panel order.
+
         Args:
             panel_images: List of panel images as bytes
             combine_narration: If True, combine all panel narrations into one text
+            max_workers: Maximum number of panel requests in flight at once
+            panels_per_call: Panels sent together in one request (see narrate_panel_group);
+                more than 1 pays for the instructions once per group instead of per panel,
+                but grouped panels are not read from or written to the narration cache
 
         Returns:
             Dict containing:
@@ -189,21 +505,25 @@ Now, analyze this comic panel and create the audiobook narration:"""
                 - total_tokens: Total tokens used across all panels
         """
         total_panels = len(panel_images)
+        panels_per_call = max(1, panels_per_call)
         panel_results = []
         total_tokens = 0
 
         logger.info(f"Generating narration for {total_panels} panels")
 
-        for i, panel_bytes in enumerate(panel_images, 1):
-            result = self.narrate_panel(
-                panel_bytes,
-                panel_number=i,
-                total_panels=total_panels
-            )
-            panel_results.append(result)
+        def narrate(group_start):
+            group = panel_images[group_start:group_start + panels_per_call]
+            if len(group) == 1:
+                result = self.narrate_panel(group[0], panel_number=group_start + 1, total_panels=total_panels)
+                return [result], result.get('tokens_used') or 0
+            return self.narrate_panel_group(group, first_panel_number=group_start + 1, total_panels=total_panels)
 
-            if result.get('tokens_used'):
-                total_tokens += result['tokens_used']
+        if total_panels:
+            group_starts = range(0, total_panels, panels_per_call)
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(group_starts))) as executor:
+                for results, tokens in executor.map(narrate, group_starts):
+                    panel_results.extend(results)
+                    total_tokens += tokens
 
         # Check if all panels succeeded
         all_success = all(r['success'] for r in panel_results)
@@ -222,6 +542,111 @@ Now, analyze this comic panel and create the audiobook narration:"""
             "panel_count": total_panels
         }
 
+    def narrate_comic_batch(
+        self,
+        panel_images: List[bytes],
+        combine_narration: bool = True,
+        poll_interval: float = 30,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate narration for multiple comic panels through the OpenAI Batch API.
+
+        For offline jobs only: the batch is billed at about half the real-time price but
+        may take up to 24 hours to complete, and this call blocks (polling) until it does.
+        Use narrate_comic for interactive requests.
+
+        Args:
+            panel_images: List of panel images as bytes
+            combine_narration: If True, combine all panel narrations into one text
+            poll_interval: Seconds between batch status checks
+            timeout: Give up waiting after this many seconds (None: wait for the batch window)
+
+        Returns:
+            Same structure as narrate_comic
+        """
+        total_panels = len(panel_images)
+        logger.info(f"Submitting batch narration for {total_panels} panels")
+
+        try:
+            requests_jsonl = "\n".join(
+                json.dumps({
+                    "custom_id": f"panel-{i}",
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self._panel_request_body(panel_bytes, i, total_panels)
+                })
+                for i, panel_bytes in enumerate(panel_images, 1)
+            )
+            input_file = self.client.files.create(
+                file=("panels.jsonl", requests_jsonl.encode('utf-8')),
+                purpose="batch"
+            )
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(f"Batch {batch.id} still {batch.status} after {timeout}s")
+                time.sleep(poll_interval)
+                batch = self.client.batches.retrieve(batch.id)
+
+            if batch.status != "completed" or not batch.output_file_id:
+                raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+            # Output lines come back in any order; match them to panels by custom_id
+            outputs = {}
+            for line in self.client.files.content(batch.output_file_id).text.splitlines():
+                if line.strip():
+                    output = json.loads(line)
+                    outputs[output["custom_id"]] = output
+            error = None
+
+        except Exception as e:
+            logger.error(f"Error generating batch narration: {str(e)}")
+            outputs, error = {}, str(e)
+
+        panel_results = []
+        for i in range(1, total_panels + 1):
+            output = outputs.get(f"panel-{i}") or {}
+            response = output.get("response") or {}
+            body = response.get("body") or {}
+            if response.get("status_code") == 200 and body.get("choices"):
+                usage = body.get("usage") or {}
+                panel_results.append({
+                    "narration": body["choices"][0]["message"]["content"].strip(),
+                    "success": True,
+                    "error": None,
+                    "raw_response": body,
+                    "tokens_used": usage.get("total_tokens")
+                })
+            else:
+                panel_results.append({
+                    "narration": "",
+                    "success": False,
+                    "error": error or str(output.get("error") or body.get("error") or "No batch output for panel"),
+                    "raw_response": None,
+                    "tokens_used": None
+                })
+
+        total_tokens = sum(r['tokens_used'] for r in panel_results if r.get('tokens_used'))
+
+        full_narration = ""
+        if combine_narration:
+            full_narration = "\n\n".join(r['narration'] for r in panel_results if r['success'])
+
+        return {
+            "full_narration": full_narration,
+            "panels": panel_results,
+            "success": all(r['success'] for r in panel_results),
+            "total_tokens": total_tokens,
+            "panel_count": total_panels
+        }
+
     def narrate_single_image(
         self,
         image_bytes: bytes,
@@ -238,8 +663,14 @@ Now, analyze this comic panel and create the audiobook narration:"""
         Returns:
             Dict containing narration and metadata
         """
+        cache_key = self._cache_key("page", image_bytes, max_tokens)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.info("Using cached narration for full comic image")
+            return cached
+
         try:
-            base64_image = self._encode_image_to_base64(image_bytes)
+            image_url = self._image_data_url(image_bytes)
 
             # Modified prompt for full comic page - optimized for TTS output
             prompt = """You are an accessibility assistant transforming a comic book page into a vivid audiobook scene.
@@ -293,7 +724,7 @@ Now analyze this comic page and create the audiobook narration:"""
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}",
+                                    "url": image_url,
                                     "detail": "high"
                                 }
                             }
@@ -308,7 +739,7 @@ Now analyze this comic page and create the audiobook narration:"""
 
             logger.info(f"Successfully generated full narration ({len(narration)} chars)")
 
-            return {
+            result = {
                 "text": narration,  # Using 'text' key for compatibility with existing pipeline
                 "narration": narration,
                 "success": True,
@@ -316,6 +747,8 @@ Now analyze this comic page and create the audiobook narration:"""
                 "tokens_used": response.usage.total_tokens if response.usage else None,
                 "confidence": 1.0  # LLM-based, assumed high confidence
             }
+            self._cache_put(cache_key, result)
+            return result
 
         except Exception as e:
             logger.error(f"Error generating full narration: {str(e)}")
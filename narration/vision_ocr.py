@@ -18,6 +18,7 @@ Mode Selection:
 
 Key Classes:
     - ComicOCR: Main class for extracting text from comic images
+    - get_ocr(): Shared process-wide ComicOCR instance
     - get_vision_client(): Lazy-initialized Google Vision client (fork-safe)
     - get_tts_client(): Lazy-initialized Google TTS client (fork-safe)
 
@@ -58,16 +59,19 @@ credentials_available = setup_credentials()
 from google.cloud import vision, texttospeech
 
 # Import remaining dependencies
-from flask import Flask, request, jsonify, send_file, render_template_string
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 import cv2
 import numpy as np
+from scipy.cluster.hierarchy import DisjointSet
+from scipy.spatial import cKDTree
 import uuid
-from datetime import datetime, timedelta
 import base64
 import re
-from itertools import permutations
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from threading import Lock
+from webutil import ORJSON_AVAILABLE, OrjsonProvider, PeriodicTask, StaticPage, remove_old_files
 
 # Import LLM narrator for audiobook-style narration
 try:
@@ -78,7 +82,24 @@ except ImportError:
     LLM_NARRATOR_AVAILABLE = False
     print("⚠️  Warning: llm_narrator module not available. Falling back to standard OCR.")
 
+# Numba is optional: it compiles the text-to-bubble assignment kernel, NumPy is used otherwise
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# OpenCV parallelises inside each call; with several workers/threads per host that
+# oversubscribes the cores, so default to one OpenCV thread (CV2_NUM_THREADS=-1 for auto)
+try:
+    cv2.setNumThreads(int(os.getenv('CV2_NUM_THREADS', '1')))
+except Exception as e:
+    print(f"⚠️  Warning: could not set OpenCV thread count: {e}")
+
+
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
 CORS(app)
 
 # Google Cloud clients are created lazily per-process because gRPC is not fork-safe
@@ -135,6 +156,33 @@ def get_tts_client():
 
     return tts_client
 
+
+# Narration text starts a new "[Panel N]" line for each panel
+_PANEL_BOUNDARY = re.compile(r'\n(?=\[Panel \d+\])')
+
+
+def synthesize_speech_by_panel(text, voice, audio_config, max_workers=4):
+    """
+    Synthesize narration text with one concurrent TTS request per panel.
+
+    The per-panel MP3 results are concatenated in reading order (MP3 frames can be
+    joined directly), so the total wait is roughly the slowest panel instead of
+    the sum of all of them. Only use with MP3 audio_config.
+    """
+    client = get_tts_client()
+    chunks = [chunk for chunk in _PANEL_BOUNDARY.split(text) if chunk.strip()]
+
+    def synthesize(chunk):
+        return client.synthesize_speech(
+            input=texttospeech.SynthesisInput(text=chunk), voice=voice, audio_config=audio_config
+        ).audio_content
+
+    if len(chunks) <= 1:
+        return synthesize(text)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        return b''.join(executor.map(synthesize, chunks))
+
 # Directories
 AUDIO_DIR = Path("/app/audio_files")
 AUDIO_DIR.mkdir(exist_ok=True)
@@ -144,16 +192,355 @@ TEMP_DIR.mkdir(exist_ok=True)
 
 def cleanup_old_files():
     """Remove files older than 1 hour"""
-    cutoff = datetime.now() - timedelta(hours=1)
-    for directory in [AUDIO_DIR, TEMP_DIR]:
-        for file in directory.glob("*"):
-            if datetime.fromtimestamp(file.stat().st_mtime) < cutoff:
-                file.unlink()
+    remove_old_files([AUDIO_DIR, TEMP_DIR], 3600)
+
+
+# Files expire after an hour, so sweeping every half hour keeps them at most 1.5h old
+CLEANUP_INTERVAL_SECONDS = 30 * 60
+_cleanup_task = PeriodicTask(
+    lambda: cleanup_old_files(), "file-cleanup",
+    on_error=lambda e: print(f"⚠️  Warning: file cleanup failed: {e}")
+)
+
+
+def start_cleanup_thread(interval=CLEANUP_INTERVAL_SECONDS):
+    """
+    Run cleanup_old_files() periodically in a daemon thread instead of on every request.
+
+    Safe to call repeatedly: only the first call in each process starts a thread.
+    Returns True if started.
+    """
+    return _cleanup_task.start(interval)
+
+
+# Generated MP3s are written in the background; get_audio() waits on a pending write
+AUDIO_WRITE_TIMEOUT = 5
+_audio_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="audio-write")
+_pending_audio = {}
+_pending_audio_lock = Lock()
+
+
+def _write_audio(audio_id, audio_content):
+    audio_path = AUDIO_DIR / f"{audio_id}.mp3"
+    part_path = audio_path.with_suffix('.part')
+    try:
+        with open(part_path, 'wb') as out:
+            out.write(audio_content)
+        os.replace(part_path, audio_path)  # never serve a half-written file
+    except OSError as e:
+        # Nobody reads the future's exception, so report it here (get_audio then returns 404)
+        print(f"⚠️  Warning: could not write audio {audio_id}: {e}")
+        part_path.unlink(missing_ok=True)
+    finally:
+        with _pending_audio_lock:
+            _pending_audio.pop(audio_id, None)
+
+
+def save_audio_async(audio_content):
+    """Queue an MP3 to be written to AUDIO_DIR and return its audio id without waiting for the disk"""
+    audio_id = str(uuid.uuid4())
+    # Registered under the lock so the writer cannot finish (and unregister) first
+    with _pending_audio_lock:
+        _pending_audio[audio_id] = _audio_executor.submit(_write_audio, audio_id, audio_content)
+    return audio_id
+
+
+def wait_for_audio(audio_id, timeout=AUDIO_WRITE_TIMEOUT):
+    """Block until a pending write of audio_id has finished (no-op if none is pending)"""
+    with _pending_audio_lock:
+        future = _pending_audio.get(audio_id)
+    if future is not None:
+        future.result(timeout=timeout)
+
+
+# Coherence scoring patterns, compiled once at import instead of on every call
+_QUESTION_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'\bwhat\b', r'\bwhy\b', r'\bhow\b', r'\bwhere\b', r'\bwhen\b', r'\bwho\b', r'\?'
+))
+_ANSWER_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'\bbecause\b', r'\bso\b', r'\btherefore\b', r'\bin short\b', r'\bwell\b'
+))
+_SVO_PATTERN = re.compile(r'\b(the|a|an)\s+\w+\s+(is|are|was|were|has|have)', re.IGNORECASE)
+_STARTER_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'^(so|well|oh|hey|look|listen|now)', r'^(tell me|show me|let me)'
+))
+# (compiled phrase, individual words, penalty when the words appear out of order)
+_BROKEN_PHRASES = tuple(
+    (re.compile(phrase.replace(' ', r'\s+'), re.IGNORECASE), tuple(phrase.split()), penalty)
+    for phrase, penalty in (
+        ('for example', -50),  # "example for" is wrong
+        ('in short', -50),
+        ('tell me about', -50),
+        ('what do they do', -50),
+        ('getting together', -50),
+    )
+)
+_QUESTION_WORDS = ('what', 'why', 'how', 'where', 'when', 'who')
+_SENTENCE_END = re.compile(r'[.!?]+')
+_TOKEN_PATTERN = re.compile(r'\w+[.,!?]?')
+# Space before punctuation, or a run of spaces; fixed in one substitution pass
+_PUNCTUATION_FIX = re.compile(r' ([,.!?])| {2,}')
+
+
+def _fix_punctuation(match):
+    """Replacement for _PUNCTUATION_FIX: keep the punctuation mark, or collapse to one space"""
+    return match.group(1) or ' '
+
+
+def _first_match_position(patterns, text):
+    """Return the earliest match offset of any pattern in text, or None"""
+    positions = [m.start() for m in (p.search(text) for p in patterns) if m]
+    return min(positions) if positions else None
+
+
+# Google Vision accepts at most this many images per batch_annotate_images call
+VISION_BATCH_SIZE = 16
+
+
+def decode_image(image_bytes):
+    """Decode raw image bytes into a BGR array (None if the bytes are not an image)"""
+    return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, nogil=True)
+    def _assign_texts_to_bubbles_jit(centers, bounds):
+        """Index of the first bubble in bounds containing each center, or -1"""
+        assignment = np.full(centers.shape[0], -1, dtype=np.int32)
+        for i in range(centers.shape[0]):
+            cx, cy = centers[i, 0], centers[i, 1]
+            for j in range(bounds.shape[0]):
+                if bounds[j, 0] <= cx <= bounds[j, 2] and bounds[j, 1] <= cy <= bounds[j, 3]:
+                    assignment[i] = j
+                    break
+        return assignment
+
+
+def _line_ids(tops, heights):
+    """
+    Line id for each text block, given blocks sorted by their top edge.
+
+    One sweep: a block joins the current line if it overlaps the line's running
+    vertical extent by more than half the average of its height and the height of
+    the line's first block, otherwise it starts a new line. Written with plain
+    indexing so the same code runs on Python lists or compiled by Numba.
+    """
+    line_ids = np.empty(len(tops), dtype=np.int64)
+    line = -1
+    line_top = line_bottom = first_height = 0.0
+    for i in range(len(tops)):
+        top = tops[i]
+        height = heights[i]
+        bottom = top + height
+        overlap = min(bottom, line_bottom) - max(top, line_top)
+        if line >= 0 and overlap > (height + first_height) / 2 * 0.5:
+            line_top = min(line_top, top)
+            line_bottom = max(line_bottom, bottom)
+        else:
+            line += 1
+            line_top = top
+            line_bottom = bottom
+            first_height = height
+        line_ids[i] = line
+    return line_ids
+
+
+if NUMBA_AVAILABLE:
+    _line_ids_jit = njit(cache=True, nogil=True)(_line_ids)
+
+
+def _group_into_lines(tops, heights):
+    """Line id for each of the (top-sorted) text blocks, compiled with Numba when available"""
+    if NUMBA_AVAILABLE:
+        return _line_ids_jit(np.ascontiguousarray(tops, dtype=np.float64),
+                             np.ascontiguousarray(heights, dtype=np.float64))
+    # Element access on lists is much cheaper than on NumPy arrays in pure Python
+    return _line_ids(tops.tolist(), heights.tolist())
+
+
+def _points_in_rects(points, rects):
+    """(N, M) mask of which (N, 2) points lie inside which (M, 4) [x1, y1, x2, y2] rects, edges included"""
+    px, py = points[:, 0:1], points[:, 1:2]
+    return (px >= rects[:, 0]) & (px <= rects[:, 2]) & (py >= rects[:, 1]) & (py <= rects[:, 3])
+
+
+def _contour_areas_and_rects(contours):
+    """
+    Areas and bounding rects of many contours at once, without a cv2 call per contour.
+
+    Returns (areas, rects): polygon areas by the shoelace formula (as cv2.contourArea)
+    and an (N, 4) array of x, y, w, h (as cv2.boundingRect, inclusive of both edges).
+    """
+    if not contours:
+        return np.empty(0), np.empty((0, 4), dtype=np.int64)
+
+    lengths = np.fromiter((len(c) for c in contours), dtype=np.intp, count=len(contours))
+    starts = np.cumsum(lengths) - lengths
+    points = np.concatenate(contours).reshape(-1, 2).astype(np.int64)
+    xs, ys = points[:, 0], points[:, 1]
+
+    # Index of each point's successor, wrapping the last point of a contour to its first
+    following = np.arange(1, len(points) + 1)
+    following[starts + lengths - 1] = starts
+
+    cross = xs * ys[following] - ys * xs[following]
+    areas = 0.5 * np.abs(np.add.reduceat(cross, starts))
+
+    min_x, min_y = np.minimum.reduceat(xs, starts), np.minimum.reduceat(ys, starts)
+    rects = np.column_stack((
+        min_x, min_y,
+        np.maximum.reduceat(xs, starts) - min_x + 1,
+        np.maximum.reduceat(ys, starts) - min_y + 1,
+    ))
+    return areas, rects
+
+
+def _sort_into_rows(items, y_key, x_key, min_overlap=0.3):
+    """
+    Sort boxes in Western reading order (rows top-to-bottom, left-to-right within a row).
+
+    Items are swept once in order of `y_key`; an item joins the current row if it
+    overlaps the row's running vertical extent by more than `min_overlap` of its
+    own height, otherwise it starts a new row. Rows are then ordered left-to-right
+    by `x_key` with a single lexsort.
+    """
+    if not items:
+        return items
+
+    order = np.argsort(np.array([item[y_key] for item in items]), kind='stable')
+    tops = [items[i]['y'] for i in order]
+    heights = [items[i]['height'] for i in order]
+
+    row_ids = np.empty(len(items), dtype=np.int64)
+    current_row = -1
+    row_top = row_bottom = 0
+    for pos, (top, height) in enumerate(zip(tops, heights)):
+        bottom = top + height
+        overlap = min(bottom, row_bottom) - max(top, row_top)
+        if current_row >= 0 and overlap > height * min_overlap:
+            row_top = min(row_top, top)
+            row_bottom = max(row_bottom, bottom)
+        else:
+            current_row += 1
+            row_top, row_bottom = top, bottom
+        row_ids[pos] = current_row
+
+    xs = np.array([items[i][x_key] for i in order])
+    final = order[np.lexsort((xs, row_ids))]
+    return [items[i] for i in final]
+
+
+# Bubble text repeats a lot (sound effects, names, stock phrases, retried pages) and both
+# functions below are pure, so results are memoized per input string
+@lru_cache(maxsize=4096)
+def _coherence_score(text):
+    """Coherence score of an already joined phrase ordering (see TextReorderer)"""
+    score = 0
+
+    text_lower = text.lower()
+
+    # 1. Questions should come before answers
+    # Each pattern is searched once; the match offset is reused for the position check
+    question_pos = _first_match_position(_QUESTION_PATTERNS, text)
+    answer_pos = _first_match_position(_ANSWER_PATTERNS, text)
+
+    if question_pos is not None and answer_pos is not None:
+        if question_pos < answer_pos:
+            score += 100  # Strong preference for Q before A
+
+    # 2. Sentence structure: Subject-Verb-Object patterns
+    # Prefer patterns like "X is Y" over "is Y X"
+    if _SVO_PATTERN.search(text):
+        score += 30
+
+    # 3. Common dialogue openers should be at the start
+    if any(pattern.search(text) for pattern in _STARTER_PATTERNS):
+        score += 20
+
+    # 4. Penalize broken common phrases
+    for phrase_pattern, words, penalty in _BROKEN_PHRASES:
+        if phrase_pattern.search(text):
+            score += 30  # Bonus for having it correctly
+        elif all(word in text_lower for word in words):
+            # Words exist but not in right order - penalty
+            score += penalty
+
+    # 5. Punctuation should make sense
+    # Questions should end with ?
+    sentences = _SENTENCE_END.split(text)
+    for sent in sentences:
+        sent = sent.strip()
+        if sent:
+            if any(word in sent.lower() for word in _QUESTION_WORDS):
+                if text[text.find(sent) + len(sent):text.find(sent) + len(sent) + 2].find('?') >= 0:
+                    score += 10
+
+    return score
+
+
+@lru_cache(maxsize=4096)
+def _reorder_text(text):
+    """Reorder jumbled text into natural reading order (see TextReorderer)"""
+    if not text or len(text.strip()) == 0:
+        return text
+    
+    # First, try to detect if text seems jumbled
+    # Look for signs: question words not followed by ?, split phrases
+    
+    # Cheap word-count precheck so most out-of-range texts never reach the regex
+    approx_tokens = text.count(' ') + 1
+    if approx_tokens < 3 or approx_tokens > 30:
+        return text
+    
+    # Split into words/tokens while preserving punctuation
+    tokens = _TOKEN_PATTERN.findall(text)
+    
+    if len(tokens) < 3 or len(tokens) > 20:
+        return text  # Too short or too long to meaningfully reorder
+    
+    # Try to find natural split points (likely separate speech bubbles)
+    # Look for: end punctuation followed by capital letter
+    # (split after the punctuation so each sentence keeps its own . ! or ?)
+    sentences = [s for s in re.split(r'(?<=[.!?])\s+(?=[A-Z])', text) if s.strip()]
+    
+    if len(sentences) == 1:
+        # Single sentence - might be internally jumbled
+        # Try common patterns
+        patterns = [
+            # Question then answer pattern
+            (r'(.*?)\s+(WELL|SO|IN SHORT|FOR EXAMPLE)[,\s]+(.*)', 
+             lambda m: f"{m.group(1)} {m.group(2)}, {m.group(3)}"),
+    
+            # "Tell me about X" pattern
+            (r'(TELL ME)\s+(THEIR|ABOUT)\s+(ABOUT|THEIR)?\s*(FESTIVALS|.*?)(!|\?|\s)', 
+             lambda m: f"TELL ME ABOUT THEIR {m.group(4)}{m.group(5)}"),
+    
+            # "What do they do" pattern
+            (r'(WHAT DO|IN SHORT)[.\s]+(FAMILY GETTING|THEY DO|TOGETHER|EATING|.*?)\s+(WHAT DO|THEY DO|TOGETHER|EATING|.*?)',
+             lambda m: f"WHAT DO THEY DO? IN SHORT. {m.group(2)} {m.group(3)}"),
+        ]
+    
+        for pattern, replacement in patterns:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                try:
+                    return replacement(match)
+                except:
+                    pass
+    
+    if len(sentences) == 2:
+        # Two sentences - swap them only when an answer comes before a question
+        first_is_answer, _, _ = TextReorderer._sentence_key(sentences[0], 0)
+        _, second_not_question, _ = TextReorderer._sentence_key(sentences[1], 1)
+        if first_is_answer and not second_not_question:
+            return f"{sentences[1]} {sentences[0]}"
+    
+    return text
 
 
 class TextReorderer:
     """Use NLP techniques to reorder jumbled text into natural reading order"""
-    
+
     @staticmethod
     def split_into_phrases(text):
         """Split text into meaningful phrases/clauses"""
@@ -181,175 +568,91 @@ class TextReorderer:
     @staticmethod
     def calculate_coherence_score(phrase_order):
         """Calculate how natural/coherent a phrase ordering is"""
-        text = ' '.join(phrase_order)
-        score = 0
-        
-        # 1. Questions should come before answers
-        question_patterns = [r'\bwhat\b', r'\bwhy\b', r'\bhow\b', r'\bwhere\b', r'\bwhen\b', r'\bwho\b', r'\?']
-        answer_patterns = [r'\bbecause\b', r'\bso\b', r'\btherefore\b', r'\bin short\b', r'\bwell\b']
-        
-        has_question = any(re.search(pattern, text, re.IGNORECASE) for pattern in question_patterns)
-        has_answer = any(re.search(pattern, text, re.IGNORECASE) for pattern in answer_patterns)
-        
-        if has_question and has_answer:
-            question_pos = min([text.lower().find(re.search(p, text, re.IGNORECASE).group()) 
-                               for p in question_patterns if re.search(p, text, re.IGNORECASE)])
-            answer_pos = min([text.lower().find(re.search(p, text, re.IGNORECASE).group()) 
-                             for p in answer_patterns if re.search(p, text, re.IGNORECASE)])
-            
-            if question_pos < answer_pos:
-                score += 100  # Strong preference for Q before A
-        
-        # 2. Sentence structure: Subject-Verb-Object patterns
-        # Prefer patterns like "X is Y" over "is Y X"
-        if re.search(r'\b(the|a|an)\s+\w+\s+(is|are|was|were|has|have)', text, re.IGNORECASE):
-            score += 30
-        
-        # 3. Common dialogue openers should be at the start
-        starters = [r'^(so|well|oh|hey|look|listen|now)', r'^(tell me|show me|let me)']
-        if any(re.search(pattern, text, re.IGNORECASE) for pattern in starters):
-            score += 20
-        
-        # 4. Penalize broken common phrases
-        broken_phrases = [
-            (r'for example', -50),  # "example for" is wrong
-            (r'in short', -50),
-            (r'tell me about', -50),
-            (r'what do they do', -50),
-            (r'getting together', -50),
-        ]
-        
-        for phrase, penalty in broken_phrases:
-            if phrase.replace(' ', r'\s+') in text.lower():
-                score += 30  # Bonus for having it correctly
-            else:
-                # Check if words exist but in wrong order
-                words = phrase.split()
-                if all(word in text.lower() for word in words):
-                    # Words exist but not in right order - penalty
-                    score += penalty
-        
-        # 5. Punctuation should make sense
-        # Questions should end with ?
-        sentences = re.split(r'[.!?]+', text)
-        for sent in sentences:
-            sent = sent.strip()
-            if sent:
-                if any(word in sent.lower() for word in ['what', 'why', 'how', 'where', 'when', 'who']):
-                    if text[text.find(sent) + len(sent):text.find(sent) + len(sent) + 2].find('?') >= 0:
-                        score += 10
-        
-        return score
+        return _coherence_score(' '.join(phrase_order))
     
     @staticmethod
     def reorder_text(text):
         """Attempt to reorder jumbled text into natural reading order"""
-        if not text or len(text.strip()) == 0:
-            return text
-            
-        # First, try to detect if text seems jumbled
-        # Look for signs: question words not followed by ?, split phrases
-        
-        # Split into words/tokens while preserving punctuation
-        tokens = re.findall(r'\w+[.,!?]?', text)
-        
-        if len(tokens) < 3 or len(tokens) > 20:
-            return text  # Too short or too long to meaningfully reorder
-        
-        # Try to find natural split points (likely separate speech bubbles)
-        # Look for: end punctuation followed by capital letter
-        sentences = re.split(r'([.!?]+\s+)(?=[A-Z])', text)
-        sentences = [s for s in sentences if s.strip() and not re.match(r'^[.!?]+\s*$', s)]
-        
-        if len(sentences) == 1:
-            # Single sentence - might be internally jumbled
-            # Try common patterns
-            patterns = [
-                # Question then answer pattern
-                (r'(.*?)\s+(WELL|SO|IN SHORT|FOR EXAMPLE)[,\s]+(.*)', 
-                 lambda m: f"{m.group(1)} {m.group(2)}, {m.group(3)}"),
-                
-                # "Tell me about X" pattern
-                (r'(TELL ME)\s+(THEIR|ABOUT)\s+(ABOUT|THEIR)?\s*(FESTIVALS|.*?)(!|\?|\s)', 
-                 lambda m: f"TELL ME ABOUT THEIR {m.group(4)}{m.group(5)}"),
-                
-                # "What do they do" pattern
-                (r'(WHAT DO|IN SHORT)[.\s]+(FAMILY GETTING|THEY DO|TOGETHER|EATING|.*?)\s+(WHAT DO|THEY DO|TOGETHER|EATING|.*?)',
-                 lambda m: f"WHAT DO THEY DO? IN SHORT. {m.group(2)} {m.group(3)}"),
-            ]
-            
-            for pattern, replacement in patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    try:
-                        return replacement(match)
-                    except:
-                        pass
-        
-        if len(sentences) == 2:
-            # Two sentences - try both orders and pick better one
-            order1 = f"{sentences[0]} {sentences[1]}"
-            order2 = f"{sentences[1]} {sentences[0]}"
-            
-            score1 = TextReorderer.calculate_coherence_score([sentences[0], sentences[1]])
-            score2 = TextReorderer.calculate_coherence_score([sentences[1], sentences[0]])
-            
-            return order1 if score1 >= score2 else order2
-        
-        return text
+        return _reorder_text(text)
+
+    @staticmethod
+    def reorder_batch(texts):
+        """Reorder a page's worth of texts in one call, handling each distinct text once"""
+        reordered = {text: _reorder_text(text) for text in dict.fromkeys(texts)}
+        return [reordered[text] for text in texts]
+
+    @staticmethod
+    def _sentence_key(sentence, index):
+        """(is answer, is not a question, position): sorts questions first and answers last"""
+        is_question = _first_match_position(_QUESTION_PATTERNS, sentence) is not None
+        is_answer = not is_question and _first_match_position(_ANSWER_PATTERNS, sentence) is not None
+        return (is_answer, not is_question, index)
 
 
 class SpeechBubbleDetector:
     """Detect and classify speech bubbles in comics"""
     
     @staticmethod
-    def detect_bubbles(image_bytes):
+    def detect_bubbles(image_bytes, accurate=False):
         """Detect speech bubbles using contour analysis"""
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
+        return SpeechBubbleDetector.detect_bubbles_arr(decode_image(image_bytes), accurate)
+
+    @staticmethod
+    def detect_bubbles_arr(img, accurate=False):
+        """
+        Detect speech bubbles in an already decoded BGR image.
+
+        By default the outline mask is a median blur followed by adaptive thresholding.
+        Set accurate=True for the slower bilateral filter + Canny edge pass, which can
+        recover faint outlines on noisy scans.
+        """
         if img is None:
             return []
         
         # Convert to grayscale
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         
-        # Apply bilateral filter to reduce noise while keeping edges sharp
-        filtered = cv2.bilateralFilter(gray, 9, 75, 75)
+        if accurate:
+            # Bilateral filter reduces noise while keeping edges sharp (~20x slower than a median blur)
+            filtered = cv2.bilateralFilter(gray, 9, 75, 75)
+        else:
+            filtered = cv2.medianBlur(gray, 5)
         
         # Use adaptive thresholding for better bubble detection
-        thresh = cv2.adaptiveThreshold(filtered, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                       cv2.THRESH_BINARY_INV, 11, 2)
+        combined = cv2.adaptiveThreshold(filtered, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
+                                         cv2.THRESH_BINARY_INV, 11, 2)
         
-        # Edge detection
-        edges = cv2.Canny(filtered, 30, 100)
-        
-        # Combine threshold and edges
-        combined = cv2.bitwise_or(thresh, edges)
+        if accurate:
+            # Add Canny edges for outlines the threshold misses
+            combined = cv2.bitwise_or(combined, cv2.Canny(filtered, 30, 100))
         
         # Morphological operations to close gaps in bubble outlines
         kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
         closed = cv2.morphologyEx(combined, cv2.MORPH_CLOSE, kernel, iterations=2)
         
-        # Find contours
-        contours, hierarchy = cv2.findContours(closed, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+        # Find contours. The hierarchy is never used, so RETR_LIST skips building it;
+        # RETR_EXTERNAL is not an option because bubbles sit inside panel frames
+        contours, _ = cv2.findContours(closed, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
         
         height, width = img.shape[:2]
         bubbles = []
-        
-        for idx, contour in enumerate(contours):
-            area = cv2.contourArea(contour)
-            
-            # Filter by area (speech bubbles are typically medium-sized)
-            if area < (width * height * 0.003) or area > (width * height * 0.4):
-                continue
-            
-            # Get bounding box
-            x, y, w, h = cv2.boundingRect(contour)
-            
-            # Skip very thin contours
-            if w < 40 or h < 25:
-                continue
+
+        # Area and bounding box of every contour in one NumPy pass, then filter by
+        # area (speech bubbles are typically medium-sized) and skip very thin contours
+        areas, rects = _contour_areas_and_rects(contours)
+        candidates = np.flatnonzero(
+            (areas >= width * height * 0.003) & (areas <= width * height * 0.4) &
+            (rects[:, 2] >= 40) & (rects[:, 3] >= 25)
+        )
+
+        # Accepted bubble boxes as (x, y, x2, y2, area) rows, for vectorized duplicate checks
+        boxes = np.empty((len(candidates), 5), dtype=np.float64)
+        box_count = 0
+
+        for idx in candidates.tolist():
+            contour = contours[idx]
+            area = float(areas[idx])
+            x, y, w, h = rects[idx].tolist()
             
             # Calculate properties
             perimeter = cv2.arcLength(contour, True)
@@ -361,7 +664,7 @@ class SpeechBubbleDetector:
                 continue
             
             # Analyze shape to determine bubble type
-            bubble_type = SpeechBubbleDetector.classify_bubble(contour, circularity, aspect_ratio)
+            bubble_type = SpeechBubbleDetector.classify_bubble(contour, circularity, aspect_ratio, perimeter)
             
             # More lenient acceptance - most contours with text could be bubbles
             if bubble_type != "unknown" or (0.3 < aspect_ratio < 4.0 and area > width * height * 0.01):
@@ -370,19 +673,18 @@ class SpeechBubbleDetector:
                 
                 # Check if this bubble overlaps significantly with an existing bubble
                 # If so, skip it (likely a duplicate detection)
-                is_duplicate = False
-                for existing in bubbles:
-                    overlap_x = max(0, min(x + w, existing['x'] + existing['width']) - max(x, existing['x']))
-                    overlap_y = max(0, min(y + h, existing['y'] + existing['height']) - max(y, existing['y']))
-                    overlap_area = overlap_x * overlap_y
-                    
-                    # If overlap is more than 70% of smaller bubble, it's a duplicate
-                    smaller_area = min(area, existing['area'])
-                    if overlap_area > smaller_area * 0.7:
-                        is_duplicate = True
-                        break
-                
+                existing = boxes[:box_count]
+                overlap_x = np.maximum(0, np.minimum(x + w, existing[:, 2]) - np.maximum(x, existing[:, 0]))
+                overlap_y = np.maximum(0, np.minimum(y + h, existing[:, 3]) - np.maximum(y, existing[:, 1]))
+                overlap_area = overlap_x * overlap_y
+
+                # If overlap is more than 70% of smaller bubble, it's a duplicate
+                smaller_area = np.minimum(area, existing[:, 4])
+                is_duplicate = bool((overlap_area > smaller_area * 0.7).any())
+
                 if not is_duplicate:
+                    boxes[box_count] = (x, y, x + w, y + h, area)
+                    box_count += 1
                     bubbles.append({
                         'x': int(x),
                         'y': int(y),
@@ -399,11 +701,13 @@ class SpeechBubbleDetector:
         return bubbles
     
     @staticmethod
-    def classify_bubble(contour, circularity, aspect_ratio):
+    def classify_bubble(contour, circularity, aspect_ratio, perimeter=None):
         """Classify bubble type based on shape characteristics"""
         
-        # Approximate the contour
-        epsilon = 0.02 * cv2.arcLength(contour, True)
+        # Approximate the contour (reuse the caller's perimeter when it has one)
+        if perimeter is None:
+            perimeter = cv2.arcLength(contour, True)
+        epsilon = 0.02 * perimeter
         approx = cv2.approxPolyDP(contour, epsilon, True)
         vertices = len(approx)
         
@@ -441,39 +745,106 @@ class SpeechBubbleDetector:
         return (bx - padding <= tx_center <= bx + bw + padding and 
                 by - padding <= ty_center <= by + bh + padding)
 
+    @staticmethod
+    def bubble_bounds_array(bubbles, padding=10):
+        """Pack bubble rectangles into an (M, 4) array of padded [x1, y1, x2, y2] bounds"""
+        bounds = np.array([[b['x'], b['y'], b['x'] + b['width'], b['y'] + b['height']] for b in bubbles],
+                          dtype=np.float64).reshape(-1, 4)
+        bounds[:, :2] -= padding
+        bounds[:, 2:] += padding
+        return bounds
+
+    @staticmethod
+    def assign_texts_to_bubbles(centers, bounds):
+        """
+        Index of the first bubble (in bounds order) containing each text center, or -1.
+
+        Uses a compiled Numba kernel when available, otherwise the NumPy membership mask.
+        """
+        if NUMBA_AVAILABLE:
+            return _assign_texts_to_bubbles_jit(np.ascontiguousarray(centers, dtype=np.float64),
+                                                np.ascontiguousarray(bounds, dtype=np.float64))
+        inside = SpeechBubbleDetector.texts_in_bubbles(centers, bounds)
+        if not inside.shape[1]:
+            return np.full(len(centers), -1, dtype=np.int32)
+        return np.where(inside.any(axis=1), inside.argmax(axis=1), -1).astype(np.int32)
+
+    @staticmethod
+    def texts_in_bubbles(centers, bounds):
+        """
+        Vectorized is_text_in_bubble: (N, 2) text centers against (M, 4) bubble bounds.
+
+        Returns an (N, M) boolean mask where [i, j] is True if text i lies in bubble j.
+        """
+        return _points_in_rects(centers, bounds)
+
 
 class ImagePreprocessor:
     """Enhance image quality for better OCR"""
     
+    # Grayscale standard deviation above which an image is already contrasty enough for Vision
+    HIGH_CONTRAST_STD = 60
+    JPEG_QUALITY = 92
+
     @staticmethod
-    def enhance_image(image_bytes):
-        """Apply preprocessing to improve OCR accuracy"""
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        if img is None:
+    def enhance_image(image_bytes, aggressive=False):
+        """
+        Apply preprocessing to improve OCR accuracy.
+
+        Google Vision does its own preprocessing, so by default this only applies a
+        cheap CLAHE contrast boost (skipped entirely for already high-contrast pages).
+        Set aggressive=True for the full CLAHE + denoise + sharpen + Otsu chain, which
+        is much slower (fastNlMeansDenoising dominates) but can help on noisy scans.
+        """
+        enhanced = ImagePreprocessor.enhance_image_arr(decode_image(image_bytes), aggressive)
+        if enhanced is None:
             return image_bytes
-        
+        return ImagePreprocessor.encode_image(enhanced) or image_bytes
+
+    @staticmethod
+    def enhance_image_arr(img, aggressive=False):
+        """
+        Enhance an already decoded BGR image.
+
+        Returns the enhanced grayscale array, or None when the image is missing or
+        needs no enhancement (so callers can keep sending the original bytes).
+        """
+        if img is None:
+            return None
+
         # Convert to grayscale
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
+
+        if not aggressive and gray.std() > ImagePreprocessor.HIGH_CONTRAST_STD:
+            return None
+
         # Increase contrast using CLAHE
         clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
         enhanced = clahe.apply(gray)
-        
-        # Denoise
-        denoised = cv2.fastNlMeansDenoising(enhanced, h=10)
-        
-        # Sharpen
-        kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
-        sharpened = cv2.filter2D(denoised, -1, kernel)
-        
-        # Threshold to make text clearer
-        _, binary = cv2.threshold(sharpened, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        
-        # Convert back to bytes
-        _, buffer = cv2.imencode('.png', binary)
-        return buffer.tobytes()
+
+        if aggressive:
+            # Denoise
+            denoised = cv2.fastNlMeansDenoising(enhanced, h=10)
+
+            # Sharpen
+            kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
+            sharpened = cv2.filter2D(denoised, -1, kernel)
+
+            # Threshold to make text clearer
+            _, enhanced = cv2.threshold(sharpened, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+        return enhanced
+
+    @staticmethod
+    def encode_image(img):
+        """
+        Encode an image array as JPEG bytes, or None if encoding fails.
+
+        This is the only encode on the OCR path and happens right before the Vision
+        call; JPEG is accepted by Vision and encodes far faster than PNG's zlib pass.
+        """
+        ok, buffer = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, ImagePreprocessor.JPEG_QUALITY])
+        return buffer.tobytes() if ok else None
 
 
 class ComicOCR:
@@ -486,9 +857,10 @@ class ComicOCR:
     
     def detect_panels(self, image_bytes):
         """Detect comic panels using edge detection"""
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
+        return self.detect_panels_arr(decode_image(image_bytes))
+
+    def detect_panels_arr(self, img):
+        """Detect comic panels in an already decoded BGR image"""
         if img is None:
             return []
         
@@ -530,150 +902,69 @@ class ComicOCR:
     
     def sort_panels_reading_order(self, panels):
         """Sort panels in Western comic reading order (left-to-right, top-to-bottom)"""
-        if not panels:
-            return panels
-        
-        # Group panels into rows
-        rows = []
-        sorted_by_y = sorted(panels, key=lambda p: p['y'])
-        
-        for panel in sorted_by_y:
-            placed = False
-            panel_top = panel['y']
-            panel_bottom = panel['y'] + panel['height']
-            
-            for row in rows:
-                row_top = min(p['y'] for p in row)
-                row_bottom = max(p['y'] + p['height'] for p in row)
-                overlap = min(panel_bottom, row_bottom) - max(panel_top, row_top)
-                
-                # If panels overlap vertically by at least 30%, they're in the same row
-                if overlap > panel['height'] * 0.3:
-                    row.append(panel)
-                    placed = True
-                    break
-            
-            if not placed:
-                rows.append([panel])
-        
-        # Sort each row left-to-right
-        sorted_panels = []
-        for row in rows:
-            row_sorted = sorted(row, key=lambda p: p['x'])
-            sorted_panels.extend(row_sorted)
-        
-        return sorted_panels
-    
+        # If panels overlap vertically by at least 30%, they're in the same row
+        return _sort_into_rows(panels, y_key='y', x_key='x')
+
     def sort_bubbles_in_panel(self, bubbles):
         """Sort speech bubbles in natural reading order within a panel"""
-        if not bubbles:
-            return bubbles
-        
-        # Sort by vertical position first (top to bottom), then horizontal (left to right)
-        # Group bubbles that are roughly at the same height
-        rows = []
-        sorted_by_y = sorted(bubbles, key=lambda b: b['center_y'])
-        
-        for bubble in sorted_by_y:
-            placed = False
-            bubble_top = bubble['y']
-            bubble_bottom = bubble['y'] + bubble['height']
-            
-            for row in rows:
-                row_top = min(b['y'] for b in row)
-                row_bottom = max(b['y'] + b['height'] for b in row)
-                overlap = min(bubble_bottom, row_bottom) - max(bubble_top, row_top)
-                
-                # If bubbles overlap vertically, they're in the same "row"
-                if overlap > bubble['height'] * 0.3:
-                    row.append(bubble)
-                    placed = True
-                    break
-            
-            if not placed:
-                rows.append([bubble])
-        
-        # Sort each row left-to-right
-        sorted_bubbles = []
-        for row in rows:
-            row_sorted = sorted(row, key=lambda b: b['center_x'])
-            sorted_bubbles.extend(row_sorted)
-        
-        return sorted_bubbles
+        # Group bubbles that are roughly at the same height, then read each row left to right
+        return _sort_into_rows(bubbles, y_key='center_y', x_key='center_x')
     
     def group_text_by_proximity(self, text_blocks):
         """Group text blocks that are close together (likely same bubble) using spatial clustering"""
         if not text_blocks:
             return []
         
-        # Use a more sophisticated clustering approach
-        # Calculate average text dimensions
-        avg_height = sum(t['height'] for t in text_blocks) / len(text_blocks)
-        avg_width = sum(t['width'] for t in text_blocks) / len(text_blocks)
-        
-        groups = []
-        used = set()
-        
-        for i, text in enumerate(text_blocks):
-            if i in used:
-                continue
-            
-            # Start new group
-            group = [text]
-            used.add(i)
-            
-            # Find nearby text blocks iteratively (to build connected groups)
-            changed = True
-            while changed:
-                changed = False
-                for j, other in enumerate(text_blocks):
-                    if j in used:
-                        continue
-                    
-                    # Check if close to ANY text in the current group
-                    min_dist = float('inf')
-                    closest_in_group = None
-                    
-                    for group_text in group:
-                        # Calculate distance between text blocks (center to center)
-                        center1_x = group_text['x'] + group_text['width'] / 2
-                        center1_y = group_text['y'] + group_text['height'] / 2
-                        center2_x = other['x'] + other['width'] / 2
-                        center2_y = other['y'] + other['height'] / 2
-                        
-                        dist_x = abs(center1_x - center2_x)
-                        dist_y = abs(center1_y - center2_y)
-                        
-                        # Calculate Euclidean distance
-                        euclidean_dist = (dist_x ** 2 + dist_y ** 2) ** 0.5
-                        
-                        if euclidean_dist < min_dist:
-                            min_dist = euclidean_dist
-                            closest_in_group = (dist_x, dist_y)
-                    
-                    if closest_in_group:
-                        dist_x, dist_y = closest_in_group
-                        
-                        # MUCH STRICTER criteria
-                        # Words in the same bubble are typically:
-                        # - Very close vertically (within 1.5x height)
-                        # - Reasonably close horizontally (within 2.5x width)
-                        vertical_threshold = avg_height * 1.5  # Reduced from 2.0
-                        horizontal_threshold = avg_width * 2.5  # Reduced from 4.0
-                        
-                        is_close_vertically = dist_y < vertical_threshold
-                        is_close_horizontally = dist_x < horizontal_threshold
-                        
-                        # MUST be close in BOTH dimensions
-                        if is_close_vertically and is_close_horizontally:
-                            group.append(other)
-                            used.add(j)
-                            changed = True
-                            break
-            
-            groups.append(group)
+        groups = self.group_indices_by_proximity(
+            np.array([t['x'] for t in text_blocks], dtype=np.float64),
+            np.array([t['y'] for t in text_blocks], dtype=np.float64),
+            np.array([t['width'] for t in text_blocks], dtype=np.float64),
+            np.array([t['height'] for t in text_blocks], dtype=np.float64),
+        )
+        return [[text_blocks[i] for i in group] for group in groups]
+    
+    def group_indices_by_proximity(self, xs, ys, widths, heights):
+        """
+        Array form of group_text_by_proximity.
+
+        Takes parallel arrays of block positions and sizes and returns the groups as
+        index arrays, in order of each group's first block.
+        """
+        count = len(xs)
+        if not count:
+            return []
         
-        return groups
+        centers = np.column_stack((xs + widths / 2, ys + heights / 2)).astype(np.float64)
+
+        # Words in the same bubble are typically:
+        # - Very close vertically (within 1.5x height)
+        # - Reasonably close horizontally (within 2.5x width)
+        vertical_threshold = heights.mean() * 1.5
+        horizontal_threshold = widths.mean() * 2.5
+
+        groups_by_root = DisjointSet(range(count))
+
+        if vertical_threshold > 0 and horizontal_threshold > 0:
+            # Scale each axis by its threshold so "close in BOTH dimensions" becomes a
+            # unit ball in the Chebyshev (max-norm) metric, answered by the KD-tree
+            scaled = centers / (horizontal_threshold, vertical_threshold)
+            tree = cKDTree(scaled)
+            pairs = tree.query_pairs(r=1.0, p=np.inf, output_type='ndarray')
+
+            # query_pairs is inclusive; keep the original strict "<" thresholds
+            if len(pairs):
+                distances = np.abs(scaled[pairs[:, 0]] - scaled[pairs[:, 1]]).max(axis=1)
+                pairs = pairs[distances < 1.0]
+
+            # Union connected pairs to get transitive groups
+            for i, j in pairs.tolist():
+                groups_by_root.merge(i, j)
+
+        groups = {}
+        for i in range(count):
+            groups.setdefault(groups_by_root[i], []).append(i)
+
+        return [np.array(group, dtype=np.intp) for group in groups.values()]
     
     def extract_text(self, image_bytes, preprocess=True, use_llm=None):
         """
@@ -681,7 +972,9 @@ class ComicOCR:
 
         Args:
             image_bytes: Raw image bytes
-            preprocess: Whether to preprocess image (only for OCR mode)
+            preprocess: Whether to preprocess image (only for OCR mode).
+                True applies a light contrast boost; "aggressive" runs the full
+                denoise/sharpen/binarize chain
             use_llm: Override to use LLM narration. If None, uses config.USE_LLM_NARRATOR
 
         Returns:
@@ -738,16 +1031,83 @@ class ComicOCR:
         except Exception as exc:
             raise Exception("Google Vision client not initialized. Please check your credentials.") from exc
         
-        # Preprocess if requested
-        if preprocess:
-            processed_bytes = self.preprocessor.enhance_image(image_bytes)
-        else:
-            processed_bytes = image_bytes
-        
-        # Run Google Vision API
+        img, processed_bytes = self._prepare_image(image_bytes, preprocess)
+
+        # Run the Google Vision RPC and bubble detection on worker threads while panels are
+        # detected here; the network wait and OpenCV's C code both release the GIL
         image = vision.Image(content=processed_bytes)
-        response = vision_client.text_detection(image=image)
-        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            vision_future = executor.submit(vision_client.text_detection, image=image)
+            bubbles_future = executor.submit(self.bubble_detector.detect_bubbles_arr, img)
+            panels = self.detect_panels_arr(img)
+            response = vision_future.result()
+            all_bubbles = bubbles_future.result()
+
+        return self._build_ocr_result(response, panels, all_bubbles)
+
+    def extract_text_batch(self, images, preprocess=True):
+        """
+        Extract text from several comic pages with batched Google Vision requests.
+
+        Pages are sent VISION_BATCH_SIZE at a time through batch_annotate_images,
+        while panel and bubble detection for every page runs on a thread pool.
+        Batching only pays off for more than a handful of pages (roughly 5+);
+        for a single page use extract_text. Always uses OCR mode.
+
+        API only: the servers and workers run one job per page and call extract_text.
+
+        Args:
+            images: List of raw image bytes
+            preprocess: Same as for extract_text
+
+        Returns:
+            List of result dicts, in the same order as images. A page Vision failed on
+            gets an empty result with an "error" message instead of failing the batch
+        """
+        try:
+            vision_client = get_vision_client()
+        except Exception as exc:
+            raise Exception("Google Vision client not initialized. Please check your credentials.") from exc
+
+        prepared = [self._prepare_image(image_bytes, preprocess) for image_bytes in images]
+        feature = vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)
+
+        with ThreadPoolExecutor() as executor:
+            panel_futures = [executor.submit(self.detect_panels_arr, img) for img, _ in prepared]
+            bubble_futures = [executor.submit(self.bubble_detector.detect_bubbles_arr, img) for img, _ in prepared]
+
+            responses = []
+            for start in range(0, len(prepared), VISION_BATCH_SIZE):
+                batch = [
+                    vision.AnnotateImageRequest(image=vision.Image(content=processed_bytes), features=[feature])
+                    for _, processed_bytes in prepared[start:start + VISION_BATCH_SIZE]
+                ]
+                responses.extend(vision_client.batch_annotate_images(requests=batch).responses)
+
+            results = []
+            for response, panels_future, bubbles_future in zip(responses, panel_futures, bubble_futures):
+                if response.error.message:
+                    results.append({"text": "", "panels": [], "panel_count": 0, "bubbles": [], "bubble_count": 0,
+                                    "text_blocks": [], "confidence": 0,
+                                    "error": f"Vision API Error: {response.error.message}"})
+                else:
+                    results.append(self._build_ocr_result(response, panels_future.result(), bubbles_future.result()))
+            return results
+
+    def _prepare_image(self, image_bytes, preprocess):
+        """Decode a page once and return (BGR array, bytes to send to Vision)"""
+        img = decode_image(image_bytes)
+
+        processed_bytes = image_bytes
+        if preprocess:
+            enhanced = self.preprocessor.enhance_image_arr(img, aggressive=(preprocess == "aggressive"))
+            if enhanced is not None:
+                processed_bytes = self.preprocessor.encode_image(enhanced) or image_bytes
+
+        return img, processed_bytes
+
+    def _build_ocr_result(self, response, panels, all_bubbles):
+        """Assign Vision text to detected panels and bubbles and build the result dict"""
         if response.error.message:
             raise Exception(f"Vision API Error: {response.error.message}")
         
@@ -755,195 +1115,139 @@ class ComicOCR:
         if not texts:
             return {"text": "", "panels": [], "bubbles": [], "text_blocks": [], "confidence": 0}
         
-        # Detect panels and speech bubbles
-        panels = self.detect_panels(image_bytes)
-        all_bubbles = self.bubble_detector.detect_bubbles(image_bytes)
-        
-        # Build text blocks with confidence scores
-        text_blocks = []
-        for text in texts[1:]:  # Skip first element (full text)
-            vertices = [(v.x, v.y) for v in text.bounding_poly.vertices]
-            x_coords = [v[0] for v in vertices]
-            y_coords = [v[1] for v in vertices]
-            x, y = min(x_coords), min(y_coords)
-            width = max(x_coords) - x
-            height = max(y_coords) - y
-            
-            confidence = getattr(text, 'confidence', 1.0)
-            
-            text_blocks.append({
-                'text': text.description,
-                'x': x,
-                'y': y,
-                'width': width,
-                'height': height,
-                'confidence': confidence,
-                'used': False  # Track if text has been assigned to a bubble
-            })
+        # Text blocks as parallel arrays (structure of arrays); texts[0] is the full text
+        words = texts[1:]
+        count = len(words)
+        corners = np.empty((count, 4, 2), dtype=np.int32)
+        confidences = np.empty(count, dtype=np.float64)
+        strings = [None] * count
+        
+        # One pass over the Vision annotations, filling the preallocated arrays
+        for i, word in enumerate(words):
+            corners[i] = [(v.x, v.y) for v in word.bounding_poly.vertices]
+            confidences[i] = getattr(word, 'confidence', 1.0)
+            strings[i] = word.description
+        
+        xs = corners[:, :, 0].min(axis=1)
+        ys = corners[:, :, 1].min(axis=1)
+        widths = corners[:, :, 0].max(axis=1) - xs
+        heights = corners[:, :, 1].max(axis=1) - ys
+        text_centers = np.column_stack((xs + widths / 2, ys + heights / 2))
+        text_used = np.zeros(count, dtype=bool)  # Track if text has been assigned to a bubble
         
         # Calculate average confidence
-        avg_confidence = sum(b['confidence'] for b in text_blocks) / len(text_blocks) if text_blocks else 0
+        avg_confidence = float(confidences.mean()) if count else 0
         
-        # Process each panel
-        all_text = []
-        panel_data = []
-        bubble_data = []
+        # Which panels each bubble center falls in, for all bubbles and panels at once
+        panel_rects = np.array([(p['x'], p['y'], p['x'] + p['width'], p['y'] + p['height']) for p in panels],
+                               dtype=np.float64).reshape(-1, 4)
+        bubble_centers = np.array([(b['center_x'], b['center_y']) for b in all_bubbles],
+                                  dtype=np.float64).reshape(-1, 2)
+        bubble_in_panel = _points_in_rects(bubble_centers, panel_rects)
+        
+        # Same for the top-left corner of each text block
+        text_in_panel = _points_in_rects(np.column_stack((xs, ys)), panel_rects)
+        
+        # Pass 1: assign text to panels and bubbles and assemble each passage's raw text.
+        # Passages are (panel index, bubble or None, bubble position, raw text) in reading order
+        text_panels = []
+        passages = []
         
         for panel_idx, panel in enumerate(panels):
             # Find bubbles in this panel
-            panel_bubbles = [b for b in all_bubbles 
-                           if panel['x'] <= b['center_x'] <= panel['x'] + panel['width']
-                           and panel['y'] <= b['center_y'] <= panel['y'] + panel['height']]
+            panel_bubbles = [all_bubbles[i] for i in np.flatnonzero(bubble_in_panel[:, panel_idx])]
             
             # Sort bubbles in reading order
             panel_bubbles = self.sort_bubbles_in_panel(panel_bubbles)
             
-            if panel_bubbles or any(self.is_text_in_panel(t, panel) for t in text_blocks):
-                panel_label = f"[Panel {panel_idx + 1}]"
-                all_text.append(panel_label)
-                panel_texts = []
+            # Text blocks whose top-left corner lies in this panel
+            in_panel = text_in_panel[:, panel_idx]
+            
+            if panel_bubbles or in_panel.any():
+                text_panels.append(panel_idx)
+                
+                # First bubble (in reading order) of this panel containing each unused text
+                # block, in one call; bubbles claim text in that same order, so this decides ownership
+                candidates = np.flatnonzero(~text_used)
+                bubble_of_candidate = self.bubble_detector.assign_texts_to_bubbles(
+                    text_centers[candidates], self.bubble_detector.bubble_bounds_array(panel_bubbles)
+                )
                 
                 # Process each bubble in order
                 for bubble_idx, bubble in enumerate(panel_bubbles):
                     # Find text blocks that belong to this bubble and haven't been used
-                    bubble_texts = [t for t in text_blocks 
-                                  if not t['used'] and self.bubble_detector.is_text_in_bubble(t, bubble)]
+                    bubble_indices = candidates[bubble_of_candidate == bubble_idx]
                     
-                    if bubble_texts:
+                    if bubble_indices.size:
                         # Mark texts as used
-                        for t in bubble_texts:
-                            t['used'] = True
-                        
-                        # IMPROVED SORTING: Group into lines first, then sort each line left-to-right
-                        # Step 1: Sort by Y position to get rough line groupings
-                        bubble_texts.sort(key=lambda t: t['y'])
-                        
-                        # Step 2: Group text blocks into lines based on Y overlap
-                        lines = []
-                        for text in bubble_texts:
-                            placed = False
-                            text_top = text['y']
-                            text_bottom = text['y'] + text['height']
-                            
-                            # Try to add to existing line
-                            for line in lines:
-                                line_top = min(t['y'] for t in line)
-                                line_bottom = max(t['y'] + t['height'] for t in line)
-                                
-                                # Check if this text overlaps vertically with the line
-                                overlap = min(text_bottom, line_bottom) - max(text_top, line_top)
-                                avg_height = (text['height'] + line[0]['height']) / 2
-                                
-                                if overlap > avg_height * 0.5:  # 50% overlap means same line
-                                    line.append(text)
-                                    placed = True
-                                    break
-                            
-                            if not placed:
-                                lines.append([text])
-                        
-                        # Step 3: Sort each line left-to-right and combine
-                        sorted_lines = []
-                        for line in lines:
-                            line.sort(key=lambda t: t['x'])
-                            line_text = ' '.join([t['text'] for t in line])
-                            sorted_lines.append(line_text)
-                        
-                        # Join all lines with space for natural speech flow
-                        text_content = ' '.join(sorted_lines)
-                        
-                        # Clean up extra spaces and punctuation issues
-                        text_content = text_content.replace(' ,', ',').replace(' .', '.').replace(' !', '!').replace(' ?', '?')
-                        text_content = text_content.replace('  ', ' ').strip()
-                        
-                        # ===== APPLY NLP TEXT REORDERING =====
-                        text_content = self.text_reorderer.reorder_text(text_content)
-                        
-                        # Format based on bubble type
-                        bubble_type = bubble['type']
-                        
-                        if bubble_type == "thought":
-                            formatted_text = f"(thinking: {text_content})"
-                        elif bubble_type == "shout":
-                            formatted_text = text_content.upper()
-                        elif bubble_type == "whisper":
-                            formatted_text = f"(whispers: {text_content})"
-                        elif bubble_type == "caption":
-                            formatted_text = f"[{text_content}]"
-                        else:  # speech
-                            formatted_text = text_content
-                        
-                        all_text.append(formatted_text)
-                        panel_texts.append(formatted_text)
-                        
-                        bubble_data.append({
-                            'panel': panel_idx + 1,
-                            'bubble_type': bubble_type,
-                            'text': text_content,
-                            'position': bubble_idx + 1
-                        })
+                        text_used[bubble_indices] = True
+                        passages.append((panel_idx, bubble, bubble_idx,
+                                         self._compose_text(bubble_indices, xs, ys, heights, strings)))
                 
                 # Handle text not in any bubble (captions, sound effects) that hasn't been used
-                non_bubble_text = [t for t in text_blocks 
-                                 if not t['used'] 
-                                 and self.is_text_in_panel(t, panel)]
+                non_bubble_indices = np.flatnonzero(in_panel & ~text_used)
                 
-                if non_bubble_text:
+                if non_bubble_indices.size:
+                    text_used[non_bubble_indices] = True
+                    
                     # Group non-bubble text by proximity (likely same speech bubble missed by detection)
-                    text_groups = self.group_text_by_proximity(non_bubble_text)
+                    text_groups = [
+                        non_bubble_indices[group] for group in self.group_indices_by_proximity(
+                            xs[non_bubble_indices], ys[non_bubble_indices],
+                            widths[non_bubble_indices], heights[non_bubble_indices])
+                    ]
                     
                     # Sort groups by reading order (top-to-bottom, left-to-right)
-                    text_groups.sort(key=lambda g: (min(t['y'] for t in g), min(t['x'] for t in g)))
+                    text_groups.sort(key=lambda g: (ys[g].min(), xs[g].min()))
                     
                     for group in text_groups:
-                        # Sort by Y first to get lines
-                        group.sort(key=lambda t: t['y'])
-                        
-                        # Group into lines based on Y overlap
-                        lines = []
-                        for text in group:
-                            text['used'] = True
-                            placed = False
-                            text_top = text['y']
-                            text_bottom = text['y'] + text['height']
-                            
-                            for line in lines:
-                                line_top = min(t['y'] for t in line)
-                                line_bottom = max(t['y'] + t['height'] for t in line)
-                                overlap = min(text_bottom, line_bottom) - max(text_top, line_top)
-                                avg_height = (text['height'] + line[0]['height']) / 2
-                                
-                                if overlap > avg_height * 0.5:
-                                    line.append(text)
-                                    placed = True
-                                    break
-                            
-                            if not placed:
-                                lines.append([text])
-                        
-                        # Sort each line left-to-right
-                        sorted_lines = []
-                        for line in lines:
-                            line.sort(key=lambda t: t['x'])
-                            line_text = ' '.join([t['text'] for t in line])
-                            sorted_lines.append(line_text)
-                        
-                        combined_text = ' '.join(sorted_lines)
-                        combined_text = combined_text.replace(' ,', ',').replace(' .', '.').replace(' !', '!').replace(' ?', '?')
-                        combined_text = combined_text.replace('  ', ' ').strip()
-                        
-                        # ===== APPLY NLP TEXT REORDERING =====
-                        combined_text = self.text_reorderer.reorder_text(combined_text)
-                        
-                        all_text.append(combined_text)
-                        panel_texts.append(combined_text)
-                
-                if panel_texts:
-                    panel_data.append({
+                        passages.append((panel_idx, None, None,
+                                         self._compose_text(group, xs, ys, heights, strings)))
+        
+        # ===== APPLY NLP TEXT REORDERING (one batch for the whole page) =====
+        reordered = self.text_reorderer.reorder_batch([passage[3] for passage in passages])
+        
+        # Pass 2: format passages and build the per-panel output
+        passages_by_panel = {panel_idx: [] for panel_idx in text_panels}
+        for (panel_idx, bubble, bubble_idx, _), text_content in zip(passages, reordered):
+            passages_by_panel[panel_idx].append((bubble, bubble_idx, text_content))
+        
+        all_text = []
+        panel_data = []
+        bubble_data = []
+        
+        for panel_idx, panel_passages in passages_by_panel.items():
+            all_text.append(f"[Panel {panel_idx + 1}]")
+            panel_texts = []
+            
+            for bubble, bubble_idx, text_content in panel_passages:
+                if bubble is None:
+                    formatted_text = text_content
+                else:
+                    formatted_text = self._format_bubble_text(bubble['type'], text_content)
+                    bubble_data.append({
                         'panel': panel_idx + 1,
-                        'text': '\n'.join(panel_texts),
-                        'bubble_count': len([t for t in panel_texts if not t.startswith('[')])
+                        'bubble_type': bubble['type'],
+                        'text': text_content,
+                        'position': bubble_idx + 1
                     })
+                
+                all_text.append(formatted_text)
+                panel_texts.append(formatted_text)
+            
+            if panel_texts:
+                panel_data.append({
+                    'panel': panel_idx + 1,
+                    'text': '\n'.join(panel_texts),
+                    'bubble_count': len([t for t in panel_texts if not t.startswith('[')])
+                })
+        
+        # Dict form of the text blocks only at the API boundary
+        text_blocks = [
+            {'text': text, 'x': x, 'y': y, 'width': w, 'height': h, 'confidence': confidence}
+            for text, x, y, w, h, confidence in zip(
+                strings, xs.tolist(), ys.tolist(), widths.tolist(), heights.tolist(), confidences.tolist())
+        ]
         
         return {
             "text": '\n'.join(all_text),
@@ -956,11 +1260,59 @@ class ComicOCR:
             "narration_mode": "ocr"
         }
     
-    def is_text_in_panel(self, text_block, panel):
-        """Check if text block is within a panel"""
+    def _compose_text(self, indices, xs, ys, heights, strings):
+        """
+        Read a set of text blocks as one passage: group them into lines by vertical
+        overlap, read each line left-to-right and tidy punctuation.
+        """
+        # Sweep top-to-bottom assigning line ids, then read line by line, left-to-right
+        indices = indices[np.argsort(ys[indices], kind='stable')]
+        line_ids = _group_into_lines(ys[indices], heights[indices])
+        indices = indices[np.lexsort((xs[indices], line_ids))]
+        
+        # Join all lines with space for natural speech flow
+        text = ' '.join(strings[i] for i in indices.tolist())
+        
+        # Clean up extra spaces and punctuation issues
+        return _PUNCTUATION_FIX.sub(_fix_punctuation, text).strip()
+    
+    @staticmethod
+    def _format_bubble_text(bubble_type, text_content):
+        """Format bubble text for narration based on bubble type"""
+        if bubble_type == "thought":
+            return f"(thinking: {text_content})"
+        elif bubble_type == "shout":
+            return text_content.upper()
+        elif bubble_type == "whisper":
+            return f"(whispers: {text_content})"
+        elif bubble_type == "caption":
+            return f"[{text_content}]"
+        else:  # speech
+            return text_content
+    
+    @staticmethod
+    def is_text_in_panel(text_block, panel):
+        """Check if text block is within a panel (see _points_in_rects for the vectorized form)"""
         text_x, text_y = text_block['x'], text_block['y']
-        return (panel['x'] <= text_x <= panel['x'] + panel['width'] and 
-                panel['y'] <= text_y <= panel['y'] + panel['height'])
+        px, py = panel['x'], panel['y']
+        return (px <= text_x <= px + panel['width'] and 
+                py <= text_y <= py + panel['height'])
+
+
+_ocr_lock = Lock()
+_ocr_instance = None
+
+
+def get_ocr():
+    """Return the process-wide ComicOCR instance, creating it on first use."""
+    global _ocr_instance
+
+    if _ocr_instance is None:
+        with _ocr_lock:
+            if _ocr_instance is None:
+                _ocr_instance = ComicOCR()
+
+    return _ocr_instance
 
 
 # HTML Template with enhanced UI
@@ -1300,23 +1652,46 @@ HTML_TEMPLATE = """
       try {
         const response = await fetch('/api/process-comic', {
           method: 'POST',
+          headers: { 'Accept': 'application/x-ndjson' },
           body: formData
         });
 
-        const data = await response.json();
-
-        if (data.success) {
-          document.getElementById('panelCount').textContent = data.panel_count;
-          document.getElementById('bubbleCount').textContent = data.bubble_count;
-          document.getElementById('confidence').textContent = 
-            Math.round(data.confidence * 100) + '%';
-          document.getElementById('extractedText').value = data.extracted_text;
-          document.getElementById('audioPlayer').src = data.audio_url;
-
-          resultsDiv.style.display = 'block';
-        } else {
+        // Validation errors still come back as a single JSON object
+        if (!(response.headers.get('Content-Type') || '').includes('ndjson')) {
+          const data = await response.json();
           alert('Error: ' + (data.error || 'Unknown error'));
+          return;
         }
+
+        // One JSON event per line: show the text as soon as OCR is done, then the audio
+        const handleEvent = (data) => {
+          if (data.event === 'text') {
+            document.getElementById('extractedText').value = data.extracted_text;
+            resultsDiv.style.display = 'block';
+          } else if (data.event === 'audio') {
+            document.getElementById('audioPlayer').src = data.audio_url;
+          } else if (data.event === 'done') {
+            document.getElementById('panelCount').textContent = data.panel_count;
+            document.getElementById('bubbleCount').textContent = data.bubble_count;
+            document.getElementById('confidence').textContent = 
+              Math.round(data.confidence * 100) + '%';
+          } else if (data.event === 'error') {
+            alert('Error: ' + (data.error || 'Unknown error'));
+          }
+        };
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = '';
+        while (true) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffered += decoder.decode(value, { stream: true });
+          const lines = buffered.split('\\n');
+          buffered = lines.pop();
+          lines.filter(line => line.trim()).forEach(line => handleEvent(JSON.parse(line)));
+        }
+        if (buffered.trim()) handleEvent(JSON.parse(buffered));
       } catch (error) {
         alert('Error processing comic: ' + error.message);
       } finally {
@@ -1329,11 +1704,16 @@ HTML_TEMPLATE = """
 </html>
 """
 
+
+# The page has no template variables, so encode (and gzip) it once and let browsers revalidate by ETag
+_INDEX_PAGE = StaticPage(HTML_TEMPLATE, max_age=3600)
+
+
 # Routes
 @app.route('/')
 def index():
     """Serve the frontend"""
-    return render_template_string(HTML_TEMPLATE)
+    return _INDEX_PAGE.response()
 
 
 @app.route('/api/health', methods=['GET'])
@@ -1346,7 +1726,7 @@ def health_check():
 def extract_text():
     """Extract text from comic image with speech bubble detection"""
     try:
-        cleanup_old_files()
+        start_cleanup_thread()
         
         if 'image' not in request.files:
             return jsonify({"error": "No image file provided"}), 400
@@ -1357,7 +1737,7 @@ def extract_text():
         image_bytes = file.read()
         
         # Extract text with bubble detection
-        ocr = ComicOCR()
+        ocr = get_ocr()
         result = ocr.extract_text(image_bytes, preprocess=preprocess)
         
         return jsonify({
@@ -1378,7 +1758,7 @@ def extract_text():
 def generate_audio():
     """Generate audio from text"""
     try:
-        cleanup_old_files()
+        start_cleanup_thread()
         
         try:
             tts_client = get_tts_client()
@@ -1413,12 +1793,8 @@ def generate_audio():
             audio_config=audio_config
         )
         
-        # Save audio
-        audio_id = str(uuid.uuid4())
-        audio_path = AUDIO_DIR / f"{audio_id}.mp3"
-        
-        with open(audio_path, 'wb') as out:
-            out.write(response.audio_content)
+        # Save audio (written in the background, get_audio waits for it)
+        audio_id = save_audio_async(response.audio_content)
         
         return jsonify({
             "success": True,
@@ -1431,40 +1807,31 @@ def generate_audio():
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/api/process-comic', methods=['POST'])
-def process_comic():
-    """Combined endpoint: extract text and generate audio"""
+def _process_comic_events(image_bytes, preprocess, language_code, voice_name):
+    """
+    Run OCR then TTS for process_comic, yielding each result as soon as it is ready.
+
+    Yields dicts tagged with an "event" key: "text" after OCR, "audio" after TTS and
+    "done" with the page statistics, or a single "error" (with an HTTP "status").
+    """
     try:
-        cleanup_old_files()
-        
-        if 'image' not in request.files:
-            return jsonify({"error": "No image file provided"}), 400
-        
-        file = request.files['image']
-        language_code = request.form.get('language_code', 'en-US')
-        voice_name = request.form.get('voice_name', 'en-US-Neural2-F')
-        preprocess = request.form.get('preprocess', 'true').lower() == 'true'
-        
-        image_bytes = file.read()
-        
         # Extract text with bubble detection
-        ocr = ComicOCR()
+        ocr = get_ocr()
         ocr_result = ocr.extract_text(image_bytes, preprocess=preprocess)
         extracted_text = ocr_result["text"]
         
         if not extracted_text:
-            return jsonify({
-                "success": False,
-                "error": "No text found in image"
-            }), 400
+            yield {"event": "error", "status": 400, "success": False, "error": "No text found in image"}
+            return
+        
+        yield {"event": "text", "extracted_text": extracted_text}
         
         # Generate audio
         try:
-            tts_client = get_tts_client()
+            get_tts_client()
         except Exception as exc:
-            return jsonify({"error": f"Text-to-Speech client not initialized: {exc}"}), 500
-            
-        synthesis_input = texttospeech.SynthesisInput(text=extracted_text)
+            yield {"event": "error", "status": 500, "error": f"Text-to-Speech client not initialized: {exc}"}
+            return
         
         voice = texttospeech.VoiceSelectionParams(
             language_code=language_code,
@@ -1477,29 +1844,67 @@ def process_comic():
             pitch=0.0
         )
         
-        response = tts_client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config
-        )
+        # Panels are synthesized concurrently rather than as one long request
+        audio_content = synthesize_speech_by_panel(extracted_text, voice, audio_config)
         
-        # Save audio
-        audio_id = str(uuid.uuid4())
-        audio_path = AUDIO_DIR / f"{audio_id}.mp3"
+        # Save audio (written in the background, get_audio waits for it)
+        audio_id = save_audio_async(audio_content)
         
-        with open(audio_path, 'wb') as out:
-            out.write(response.audio_content)
+        yield {
+            "event": "audio",
+            "audio_url": f"/api/audio/{audio_id}",
+            "characters_used": len(extracted_text)
+        }
         
-        return jsonify({
+        yield {
+            "event": "done",
             "success": True,
-            "extracted_text": extracted_text,
             "panel_count": ocr_result["panel_count"],
             "bubble_count": ocr_result["bubble_count"],
             "text_blocks": len(ocr_result["text_blocks"]),
-            "confidence": ocr_result["confidence"],
-            "audio_url": f"/api/audio/{audio_id}",
-            "characters_used": len(extracted_text)
-        })
+            "confidence": ocr_result["confidence"]
+        }
+    
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        yield {"event": "error", "status": 500, "error": str(e)}
+
+
+@app.route('/api/process-comic', methods=['POST'])
+def process_comic():
+    """
+    Combined endpoint: extract text and generate audio.
+
+    Clients that send "Accept: application/x-ndjson" get one JSON line per event from
+    _process_comic_events, so the text can be shown before TTS finishes; everyone else
+    gets the merged result as a single JSON object.
+    """
+    try:
+        start_cleanup_thread()
+        
+        if 'image' not in request.files:
+            return jsonify({"error": "No image file provided"}), 400
+        
+        file = request.files['image']
+        language_code = request.form.get('language_code', 'en-US')
+        voice_name = request.form.get('voice_name', 'en-US-Neural2-F')
+        preprocess_value = request.form.get('preprocess', 'true').lower()
+        preprocess = 'aggressive' if preprocess_value == 'aggressive' else preprocess_value == 'true'
+        
+        image_bytes = file.read()
+        events = _process_comic_events(image_bytes, preprocess, language_code, voice_name)
+        
+        if request.accept_mimetypes.best == 'application/x-ndjson':
+            lines = (app.json.dumps(event) + '\n' for event in events)
+            return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+        
+        result = {}
+        for event in events:
+            if event.pop("event") == "error":
+                status = event.pop("status")
+                return jsonify(event), status
+            result.update(event)
+        return jsonify(result)
     
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -1512,13 +1917,17 @@ def get_audio(audio_id):
     try:
         audio_path = AUDIO_DIR / f"{audio_id}.mp3"
         
+        if not audio_path.exists():
+            wait_for_audio(audio_id)
         if not audio_path.exists():
             return jsonify({"error": "Audio file not found"}), 404
         
         return send_file(
             audio_path,
             mimetype='audio/mpeg',
-            as_attachment=False
+            as_attachment=False,
+            conditional=True,  # Range requests (audio seeking) get 206 partial responses
+            max_age=3600  # Ids are never reused, so a file does not change until it expires
         )
     
     except Exception as e:
@@ -111,6 +111,7 @@ class ComicOCR:
             return panels
         
         # Group panels into rows based on Y overlap
+        # Each row keeps its running top/bottom so the overlap test is O(1)
         rows = []
         sorted_by_y = sorted(panels, key=lambda p: p['y'])
         
@@ -120,24 +121,22 @@ class ComicOCR:
             panel_bottom = panel['y'] + panel['height']
             
             for row in rows:
-                # Check if this panel overlaps vertically with the row
-                row_top = min(p['y'] for p in row)
-                row_bottom = max(p['y'] + p['height'] for p in row)
-                
                 # If significant vertical overlap, add to this row
-                overlap = min(panel_bottom, row_bottom) - max(panel_top, row_top)
+                overlap = min(panel_bottom, row['bottom']) - max(panel_top, row['top'])
                 if overlap > panel['height'] * 0.3:  # 30% overlap threshold
-                    row.append(panel)
+                    row['items'].append(panel)
+                    row['top'] = min(row['top'], panel_top)
+                    row['bottom'] = max(row['bottom'], panel_bottom)
                     placed = True
                     break
             
             if not placed:
-                rows.append([panel])
+                rows.append({'items': [panel], 'top': panel_top, 'bottom': panel_bottom})
         
         # Sort panels within each row by X position
         sorted_panels = []
         for row in rows:
-            row_sorted = sorted(row, key=lambda p: p['x'])
+            row_sorted = sorted(row['items'], key=lambda p: p['x'])
             sorted_panels.extend(row_sorted)
         
         return sorted_panels
@@ -168,6 +167,7 @@ class ComicOCR:
             
             bubble = [block]
             used.add(i)
+            block_x, block_y = block['x'], block['y']
             
             # Find nearby text that might be in same bubble
             for j, other in enumerate(text_blocks):
@@ -175,8 +175,8 @@ class ComicOCR:
                     continue
                 
                 # Check proximity
-                dist_x = abs(block['x'] - other['x'])
-                dist_y = abs(block['y'] - other['y'])
+                dist_x = abs(block_x - other['x'])
+                dist_y = abs(block_y - other['y'])
                 
                 # If close enough, likely same bubble
                 if dist_x < 50 and dist_y < 30:  # Adjust thresholds as needed
@@ -251,7 +251,10 @@ class ComicOCR:
             all_text = []
             
             for panel_idx, panel in enumerate(panels):
-                panel_text = [t for t in text_blocks if self.text_in_panel(t, panel)]
+                # Same test as text_in_panel(), with the panel bounds hoisted out of the loop
+                px1, py1 = panel['x'], panel['y']
+                px2, py2 = px1 + panel['width'], py1 + panel['height']
+                panel_text = [t for t in text_blocks if px1 <= t['x'] <= px2 and py1 <= t['y'] <= py2]
                 
                 if panel_text:
                     print(f"Panel {panel_idx + 1}: {len(panel_text)} text blocks")
@@ -0,0 +1,23 @@
+"""
+gunicorn Settings for the Interface Server
+
+Usage (from the project root):
+    gunicorn -c server/gunicorn.conf.py server.wsgi:application
+
+The app is preloaded: Flask, redis, rq and config (including the .env file) are imported
+once in the master process and the workers inherit them on fork.
+"""
+
+import os
+
+bind = "0.0.0.0:5001"
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+threads = int(os.getenv("GUNICORN_THREADS", 16))  # each open /api/job-events stream holds one
+preload_app = True
+
+
+def post_fork(server, worker):
+    # The Redis pool reconnects by itself after a fork, but the log listener thread does not survive it
+    from server import interface_server
+    interface_server.start_log_listener()
@@ -10,6 +10,7 @@ Responsibilities:
     - Accept comic image uploads via POST /api/process-comic
     - Enqueue processing jobs to Redis queue
     - Poll job status and return results via GET /api/job-status/<id>
+      (or several jobs at once via POST /api/job-status-batch)
     - Serve generated audio files via GET /api/audio/<id>
 
 Architecture Role:
@@ -22,7 +23,8 @@ Architecture Role:
                   (Poll job status)
 
 Usage:
-    python server/interface_server.py
+    python server/interface_server.py                    (development server)
+    gunicorn -c server/gunicorn.conf.py server.wsgi:application
 
 Then access http://localhost:5001 in your browser.
 """
@@ -37,22 +39,67 @@ if sys.version_info[:3] != (3, 11, 9):
     print(f"   Some features may not work correctly with other versions")
     print()
 
-from flask import Flask, request, jsonify, send_file, render_template_string
+from flask import Flask, Response, abort, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
-from redis import Redis
+from redis import BlockingConnectionPool, Redis
 from rq import Queue
-from rq.job import Job
-import uuid
-from datetime import datetime, timedelta
+from rq.exceptions import NoSuchJobError
+from rq.job import Job, JobStatus
+from rq.utils import as_text, str_to_date
+import atexit
+import hashlib
+import json
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
 import config
+from webutil import ORJSON_AVAILABLE, OrjsonProvider, PeriodicTask, StaticPage, remove_old_files
 
 
+# Request threads only enqueue log records; a listener thread formats and writes them
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
 
 
+def start_log_listener():
+    """Start the thread that drains the log queue (call again in forked children, threads don't survive fork)"""
+    listener = QueueListener(_log_queue, _log_stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+
+start_log_listener()
+logging.getLogger().addHandler(QueueHandler(_log_queue))
+logging.getLogger().setLevel(config.LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
 
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
+app.config['MAX_CONTENT_LENGTH'] = config.MAX_REQUEST_BYTES
+app.config['USE_X_SENDFILE'] = config.USE_X_SENDFILE  # send_file then only emits an X-Sendfile header
 CORS(app)
 
+
+@app.before_request
+def refuse_oversized_request():
+    """Refuse bodies over MAX_CONTENT_LENGTH from the Content-Length header, before any is read"""
+    if request.content_length is not None and request.content_length > request.max_content_length:
+        abort(413)
+
+
+@app.errorhandler(413)
+def request_too_large(e):
+    """JSON error for uploads over the request size limit"""
+    return jsonify({"error": "File too large"}), 413
+
+
+ALLOWED_IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".gif", ".webp"})
+
+
 def validate_image_upload(file):
     """
     Validate uploaded image:
@@ -63,25 +110,34 @@ def validate_image_upload(file):
     if file is None:
         return False, "No file uploaded"
 
-    allowed_extensions = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
-    filename = file.filename.lower()
-
-    if not any(filename.endswith(ext) for ext in allowed_extensions):
+    if os.path.splitext(file.filename)[1].lower() not in ALLOWED_IMAGE_EXTENSIONS:
         return False, "Unsupported file type"
 
     file.seek(0, os.SEEK_END)
     size = file.tell()
     file.seek(0)
 
-    if size > 10 * 1024 * 1024:
+    if size > config.MAX_UPLOAD_BYTES:
         return False, "File too large"
 
     return True, None
 
 
 # Connect to Redis (orchestrator/queue)
+# One bounded pool shared by every request thread and queue; when all connections are
+# busy a request waits for a free one instead of opening yet another socket
 try:
-    redis_conn = Redis(host=config.REDIS_HOST, port=config.REDIS_PORT, db=config.REDIS_DB)
+    redis_pool = BlockingConnectionPool(
+        host=config.REDIS_HOST,
+        port=config.REDIS_PORT,
+        db=config.REDIS_DB,
+        max_connections=config.REDIS_MAX_CONNECTIONS,
+        timeout=config.REDIS_POOL_TIMEOUT,
+        socket_connect_timeout=config.REDIS_POOL_TIMEOUT,
+        socket_keepalive=True,
+        health_check_interval=30,
+    )
+    redis_conn = Redis(connection_pool=redis_pool)
     redis_conn.ping()
     print(f"✓ Connected to Redis queue at {config.REDIS_HOST}:{config.REDIS_PORT}")
 except Exception as e:
@@ -90,11 +146,10 @@ except Exception as e:
     print("   Please ensure Redis is running on the orchestrator server")
     redis_conn = None
 
-# Create task queues
-# We can have different queues for different priorities or task types
-ocr_queue = Queue('ocr', connection=redis_conn) if redis_conn else None
-tts_queue = Queue('tts', connection=redis_conn) if redis_conn else None
-default_queue = Queue('default', connection=redis_conn) if redis_conn else None
+# Create task queue
+# Every job runs the full pipeline on the default queue; workers also listen on the
+# 'ocr' and 'tts' queues, so add Queue objects for those only once something enqueues there
+default_queue = Queue(config.QUEUE_DEFAULT, connection=redis_conn) if redis_conn else None
 
 # Directories - use absolute paths to avoid issues with Flask's send_file
 AUDIO_DIR = Path("/app/audio_files")
@@ -104,12 +159,30 @@ TEMP_DIR.mkdir(exist_ok=True)
 
 
 def cleanup_old_files():
-    """Remove files older than 1 hour"""
-    cutoff = datetime.now() - timedelta(hours=1)
-    for directory in [AUDIO_DIR, TEMP_DIR]:
-        for file in directory.glob("*"):
-            if datetime.fromtimestamp(file.stat().st_mtime) < cutoff:
-                file.unlink()
+    """Remove files older than FILE_CLEANUP_AGE_HOURS"""
+    remove_old_files([AUDIO_DIR, TEMP_DIR], config.FILE_CLEANUP_AGE_HOURS * 3600)
+
+
+# Old files are swept from a background thread, so uploads never wait on the directory scan
+CLEANUP_INTERVAL_SECONDS = 5 * 60
+_cleanup_task = PeriodicTask(
+    lambda: cleanup_old_files(), "file-cleanup",
+    on_error=lambda e: logger.warning(f"[INTERFACE] File cleanup failed: {e}")
+)
+
+
+def start_cleanup_thread(interval=CLEANUP_INTERVAL_SECONDS):
+    """
+    Run cleanup_old_files() periodically in a daemon thread.
+
+    Safe to call on every request: only the first call in each process starts a thread.
+    Returns True if started.
+    """
+    return _cleanup_task.start(interval)
+
+
+# Statuses after which a job's status no longer changes
+FINAL_JOB_STATUSES = (JobStatus.FINISHED, JobStatus.FAILED, JobStatus.STOPPED, JobStatus.CANCELED)
 
 
 # HTML Template (same as before, with minor updates)
@@ -367,20 +440,8 @@ HTML_TEMPLATE = """
 
     <div class="controls">
       <select class="voice-select" id="voiceSelect">
+        <!-- Filled from /api/voices; the default voice keeps the form usable until then -->
         <option value="en-US-Neural2-F" data-lang="en-US">🎭 Female Voice 1 (US)</option>
-        <option value="en-US-Neural2-C" data-lang="en-US">🎭 Female Voice 2 (US)</option>
-        <option value="en-US-Neural2-E" data-lang="en-US">🎭 Female Voice 3 (US)</option>
-        <option value="en-US-Neural2-D" data-lang="en-US">👨 Male Voice 1 (US)</option>
-        <option value="en-US-Neural2-A" data-lang="en-US">👨 Male Voice 2 (US)</option>
-        <option value="en-US-Neural2-I" data-lang="en-US">👦 Child Voice (US)</option>
-        <option value="en-GB-Neural2-A" data-lang="en-GB">🇬🇧 British Female</option>
-        <option value="en-GB-Neural2-B" data-lang="en-GB">🇬🇧 British Male</option>
-        <option value="en-AU-Neural2-A" data-lang="en-AU">🇦🇺 Australian Female</option>
-        <option value="en-AU-Neural2-B" data-lang="en-AU">🇦🇺 Australian Male</option>
-        <option value="nl-NL-Standard-A" data-lang="nl-NL">🇳🇱 Dutch Female</option>
-        <option value="nl-NL-Standard-B" data-lang="nl-NL">🇳🇱 Dutch Male</option>
-        <option value="nl-NL-Wavenet-A" data-lang="nl-NL">🇳🇱 Dutch Female (Premium)</option>
-        <option value="nl-NL-Wavenet-B" data-lang="nl-NL">🇳🇱 Dutch Male (Premium)</option>
       </select>
       <button class="button" id="processBtn" disabled>🚀 Process Comic</button>
     </div>
@@ -434,7 +495,6 @@ HTML_TEMPLATE = """
 
   <script>
     let selectedFile = null;
-    let pollInterval = null;
 
     const uploadArea = document.getElementById('uploadArea');
     const fileInput = document.getElementById('fileInput');
@@ -450,6 +510,20 @@ HTML_TEMPLATE = """
     const previewImage = document.getElementById('previewImage');
     const previewName = document.getElementById('previewName');
 
+    // Replace the placeholder option with the full voice list, keeping the current choice
+    fetch('/api/voices')
+      .then(response => response.json())
+      .then(voices => {
+        const current = voiceSelect.value;
+        voiceSelect.replaceChildren(...voices.map(voice => {
+          const option = new Option(voice.label, voice.name);
+          option.setAttribute('data-lang', voice.language_code);
+          return option;
+        }));
+        voiceSelect.value = current;
+      })
+      .catch(error => console.error('Error loading voices:', error));
+
     // Auto-select Dutch voice when translation is enabled
     translateToggle.addEventListener('change', function() {
       if (this.checked) {
@@ -534,7 +608,7 @@ HTML_TEMPLATE = """
         if (data.success && data.job_id) {
           // Start polling for job status
           updateStatus('QUEUED', 'Your task has been queued for processing...');
-          pollJobStatus(data.job_id);
+          watchJobStatus(data.job_id);
         } else {
           alert('Error: ' + (data.error || 'Unknown error'));
           loadingDiv.style.display = 'none';
@@ -558,55 +632,105 @@ HTML_TEMPLATE = """
       statusText.textContent = message;
     }
 
+    // Statuses after which a job no longer changes (the server's FINAL_JOB_STATUSES)
+    const FINAL_STATUSES = __FINAL_JOB_STATUSES__;
+
+    // Show a job status update; returns true once the job is done (any final status)
+    function handleJobStatus(data) {
+      if (data.status === 'finished') {
+        if (data.result && data.result.success) {
+          const result = data.result;
+          document.getElementById('panelCount').textContent = result.panel_count || 0;
+          document.getElementById('bubbleCount').textContent = result.bubble_count || 0;
+          document.getElementById('confidence').textContent =
+            Math.round((result.confidence || 0) * 100) + '%';
+          document.getElementById('extractedText').value = result.extracted_text || '';
+          document.getElementById('audioPlayer').src = result.audio_url || '';
+
+          // Show translated text if available
+          if (result.translated_text) {
+            document.getElementById('translatedText').value = result.translated_text;
+            document.getElementById('translatedTextBox').style.display = 'block';
+          } else {
+            document.getElementById('translatedTextBox').style.display = 'none';
+          }
+
+          updateStatus('COMPLETED', 'Processing completed successfully!');
+          loadingDiv.style.display = 'none';
+          resultsDiv.style.display = 'block';
+          processBtn.disabled = false;
+        } else {
+          updateStatus('FAILED', 'Error: ' + (data.result?.error || 'Unknown error'));
+          loadingDiv.style.display = 'none';
+          processBtn.disabled = false;
+        }
+        return true;
+      } else if (data.status === 'failed' || data.error) {
+        updateStatus('FAILED', 'Job failed: ' + (data.exc_info || data.error || 'Unknown error'));
+        loadingDiv.style.display = 'none';
+        processBtn.disabled = false;
+        return true;
+      } else if (FINAL_STATUSES.includes(data.status)) {
+        updateStatus('FAILED', 'Job ' + data.status);
+        loadingDiv.style.display = 'none';
+        processBtn.disabled = false;
+        return true;
+      } else if (data.status === 'started') {
+        updateStatus('PROCESSING', 'Worker is processing your comic...');
+      } else {
+        updateStatus('QUEUED', 'Waiting for available worker...');
+      }
+      return false;
+    }
+
+    // Status updates are pushed over server-sent events; fall back to polling without them
+    function watchJobStatus(jobId) {
+      if (!window.EventSource) {
+        pollJobStatus(jobId);
+        return;
+      }
+      const events = new EventSource(`/api/job-events/${jobId}`);
+      events.onmessage = (event) => {
+        if (handleJobStatus(JSON.parse(event.data))) events.close();
+      };
+      events.onerror = () => {
+        events.close();
+        pollJobStatus(jobId);
+      };
+    }
+
+    // Long-poll: the server holds each request until the job's ETag changes, so a 304 means
+    // "no change yet". Failed requests, and 304s the server did not hold for the wait window,
+    // are retried with exponential backoff (0.5s up to 5s)
     async function pollJobStatus(jobId) {
-      pollInterval = setInterval(async () => {
+      const waitSeconds = 25;
+      let etag = null;
+      let retryDelay = 500;
+      while (true) {
         try {
-          const response = await fetch(`/api/job-status/${jobId}`);
-          const data = await response.json();
-
-          if (data.status === 'finished') {
-            clearInterval(pollInterval);
-
-            if (data.result && data.result.success) {
-              const result = data.result;
-              document.getElementById('panelCount').textContent = result.panel_count || 0;
-              document.getElementById('bubbleCount').textContent = result.bubble_count || 0;
-              document.getElementById('confidence').textContent =
-                Math.round((result.confidence || 0) * 100) + '%';
-              document.getElementById('extractedText').value = result.extracted_text || '';
-              document.getElementById('audioPlayer').src = result.audio_url || '';
-
-              // Show translated text if available
-              if (result.translated_text) {
-                document.getElementById('translatedText').value = result.translated_text;
-                document.getElementById('translatedTextBox').style.display = 'block';
-              } else {
-                document.getElementById('translatedTextBox').style.display = 'none';
-              }
-
-              updateStatus('COMPLETED', 'Processing completed successfully!');
-              loadingDiv.style.display = 'none';
-              resultsDiv.style.display = 'block';
-              processBtn.disabled = false;
-            } else {
-              updateStatus('FAILED', 'Error: ' + (data.result?.error || 'Unknown error'));
-              loadingDiv.style.display = 'none';
-              processBtn.disabled = false;
+          const requestStart = Date.now();
+          const response = await fetch(`/api/job-status/${jobId}?wait=${waitSeconds}`, {
+            cache: 'no-store',
+            headers: etag ? { 'If-None-Match': etag } : {}
+          });
+          if (response.status === 304) {
+            if (Date.now() - requestStart < waitSeconds * 1000) {
+              await new Promise(resolve => setTimeout(resolve, retryDelay));
+              retryDelay = Math.min(retryDelay * 2, 5000);
+              continue;
             }
-          } else if (data.status === 'failed') {
-            clearInterval(pollInterval);
-            updateStatus('FAILED', 'Job failed: ' + (data.exc_info || 'Unknown error'));
-            loadingDiv.style.display = 'none';
-            processBtn.disabled = false;
-          } else if (data.status === 'started') {
-            updateStatus('PROCESSING', 'Worker is processing your comic...');
           } else {
-            updateStatus('QUEUED', 'Waiting for available worker...');
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            etag = response.headers.get('ETag');
+            if (handleJobStatus(await response.json())) return;
           }
+          retryDelay = 500;
         } catch (error) {
           console.error('Error polling job status:', error);
+          await new Promise(resolve => setTimeout(resolve, retryDelay));
+          retryDelay = Math.min(retryDelay * 2, 5000);
         }
-      }, 1000); // Poll every second
+      }
     }
   </script>
 </body>
@@ -614,11 +738,49 @@ HTML_TEMPLATE = """
 """
 
 
+# The page has no template variables, so encode (and gzip) it once and let browsers revalidate by ETag
+_INDEX_PAGE = StaticPage(
+    HTML_TEMPLATE.replace('__FINAL_JOB_STATUSES__', json.dumps([status.value for status in FINAL_JOB_STATUSES])),
+    max_age=300
+)
+
+
 # Routes
 @app.route('/')
 def index():
     """Serve the frontend"""
-    return render_template_string(HTML_TEMPLATE)
+    return _INDEX_PAGE.response()
+
+
+# Google TTS voices offered in the UI: (voice name, language code, label)
+VOICES = (
+    ('en-US-Neural2-F', 'en-US', '🎭 Female Voice 1 (US)'),
+    ('en-US-Neural2-C', 'en-US', '🎭 Female Voice 2 (US)'),
+    ('en-US-Neural2-E', 'en-US', '🎭 Female Voice 3 (US)'),
+    ('en-US-Neural2-D', 'en-US', '👨 Male Voice 1 (US)'),
+    ('en-US-Neural2-A', 'en-US', '👨 Male Voice 2 (US)'),
+    ('en-US-Neural2-I', 'en-US', '👦 Child Voice (US)'),
+    ('en-GB-Neural2-A', 'en-GB', '🇬🇧 British Female'),
+    ('en-GB-Neural2-B', 'en-GB', '🇬🇧 British Male'),
+    ('en-AU-Neural2-A', 'en-AU', '🇦🇺 Australian Female'),
+    ('en-AU-Neural2-B', 'en-AU', '🇦🇺 Australian Male'),
+    ('nl-NL-Standard-A', 'nl-NL', '🇳🇱 Dutch Female'),
+    ('nl-NL-Standard-B', 'nl-NL', '🇳🇱 Dutch Male'),
+    ('nl-NL-Wavenet-A', 'nl-NL', '🇳🇱 Dutch Female (Premium)'),
+    ('nl-NL-Wavenet-B', 'nl-NL', '🇳🇱 Dutch Male (Premium)'),
+)
+
+
+@app.route('/api/voices', methods=['GET'])
+def list_voices():
+    """Voices for the voice picker; the list only changes with a deploy, so browsers may cache it"""
+    response = jsonify([
+        {"name": name, "language_code": language_code, "label": label}
+        for name, language_code, label in VOICES
+    ])
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response
 
 
 @app.route('/api/health', methods=['GET'])
@@ -632,6 +794,18 @@ def health_check():
     })
 
 
+def pipeline_options(form):
+    """Read the TTS/translation options shared by the process-comic endpoints from the form"""
+    preprocess = form.get('preprocess', 'true').lower()
+    return {
+        "language_code": form.get('language_code', 'en-US'),
+        "voice_name": form.get('voice_name', 'en-US-Neural2-F'),
+        "preprocess": 'aggressive' if preprocess == 'aggressive' else preprocess == 'true',
+        "translate": form.get('translate', 'false').lower() == 'true',
+        "target_language": form.get('target_language', 'nl'),
+    }
+
+
 @app.route('/api/process-comic', methods=['POST'])
 def process_comic():
     """
@@ -645,40 +819,35 @@ def process_comic():
                 "error": "Queue service not available. Please ensure Redis is running."
             }), 503
 
-        cleanup_old_files()
+        start_cleanup_thread()
 
         if 'image' not in request.files:
             return jsonify({"error": "No image file provided"}), 400
 
         file = request.files['image']
-        language_code = request.form.get('language_code', 'en-US')
-        voice_name = request.form.get('voice_name', 'en-US-Neural2-F')
-        preprocess = request.form.get('preprocess', 'true').lower() == 'true'
-        translate = request.form.get('translate', 'false').lower() == 'true'
-        target_language = request.form.get('target_language', 'nl')
+        ok, error = validate_image_upload(file)
+        if not ok:
+            return jsonify({"error": error}), 400
 
-        # Read image bytes
-        image_bytes = file.read()
+        options = pipeline_options(request.form)
 
-        # Save to temp file for worker access
-        temp_id = str(uuid.uuid4())
-        temp_path = TEMP_DIR / f"{temp_id}.png"
-        with open(temp_path, 'wb') as f:
-            f.write(image_bytes)
+        # Read image bytes; they travel in the job payload so workers on other hosts
+        # (remote REDIS_HOST) need no shared filesystem
+        image_bytes = file.read()
 
         # Enqueue job (send to worker)
-        print(f"[INTERFACE] Enqueueing job: temp_id={temp_id}, translate={translate}")
+        logger.info(f"[INTERFACE] Enqueueing job: {len(image_bytes)} bytes, translate={options['translate']}")
 
-        job = default_queue.enqueue(
+        job = Job.create(
             'tasks.process_comic_full_pipeline',
-            image_bytes=image_bytes,
-            language_code=language_code,
-            voice_name=voice_name,
-            preprocess=preprocess,
-            translate=translate,
-            target_language=target_language,
-            job_timeout='10m'  # 10 minute timeout
+            kwargs={'image_bytes': image_bytes, **options},
+            connection=redis_conn,
+            timeout='10m'  # 10 minute timeout
         )
+        # Job hash, status and queue push go out in one round trip (no MULTI/EXEC needed)
+        with redis_conn.pipeline(transaction=False) as pipe:
+            default_queue.enqueue_job(job, pipeline=pipe)
+            pipe.execute()
 
         return jsonify({
             "success": True,
@@ -688,41 +857,225 @@ def process_comic():
         })
 
     except Exception as e:
-        print(f"[INTERFACE] Error: {str(e)}")
+        logger.error(f"[INTERFACE] Error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/process-comics', methods=['POST'])
+def process_comics():
+    """
+    Enqueue one full-pipeline job per uploaded page ('images' field, in page order)
+    All jobs are written to Redis in a single pipelined enqueue_many call
+    """
+    try:
+        if not redis_conn or not default_queue:
+            return jsonify({
+                "success": False,
+                "error": "Queue service not available. Please ensure Redis is running."
+            }), 503
+
+        start_cleanup_thread()
+
+        files = request.files.getlist('images')
+        if not files:
+            return jsonify({"error": "No image files provided"}), 400
+
+        for file in files:
+            ok, error = validate_image_upload(file)
+            if not ok:
+                return jsonify({"error": f"{file.filename}: {error}"}), 400
+
+        options = pipeline_options(request.form)
+        logger.info(f"[INTERFACE] Enqueueing {len(files)} jobs, translate={options['translate']}")
+
+        jobs = default_queue.enqueue_many([
+            Queue.prepare_data(
+                'tasks.process_comic_full_pipeline',
+                kwargs={"image_bytes": file.read(), **options},
+                timeout='10m'  # 10 minute timeout
+            )
+            for file in files
+        ])
+
+        return jsonify({
+            "success": True,
+            "job_ids": [job.id for job in jobs],
+            "status": "queued",
+            "message": f"{len(jobs)} tasks have been queued for processing"
+        })
+
+    except Exception as e:
+        logger.error(f"[INTERFACE] Error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+# Read only the small status fields: the job hash also holds the pickled arguments (the
+# whole uploaded image), which Job.fetch's HGETALL would transfer on every poll
+JOB_STATUS_FIELDS = ('status', 'created_at', 'started_at', 'ended_at')
+
+
+def job_status_payload(job_id, fields=None):
+    """
+    Status (and result or error once done) of a queued job, as returned by the job status endpoints
+    fields: JOB_STATUS_FIELDS values already read from the job hash (read here if not given)
+    """
+    if fields is None:
+        fields = redis_conn.hmget(Job.key_for(job_id), *JOB_STATUS_FIELDS)
+    status, created_at, started_at, ended_at = fields
+    if status is None and created_at is None:
+        raise NoSuchJobError(f"No such job: {job_id}")
+    status = as_text(status) if status else None
+
+    response = {
+        "job_id": job_id,
+        "status": status,
+        "created_at": str_to_date(created_at).isoformat() if created_at else None,
+        "started_at": str_to_date(started_at).isoformat() if started_at else None,
+        "ended_at": str_to_date(ended_at).isoformat() if ended_at else None,
+    }
+
+    # Include result if job is finished
+    if status == JobStatus.FINISHED:
+        # On Redis < 5 (no result streams) return_value() reads the job hash's result field itself
+        response["result"] = Job(job_id, connection=redis_conn).return_value()
+    elif status == JobStatus.FAILED:
+        response["exc_info"] = Job.fetch(job_id, connection=redis_conn).exc_info
+
+    return response
+
+
+@app.route('/api/job-status-batch', methods=['POST'])
+def get_job_status_batch():
+    """
+    Get status of several queued jobs at once (JSON body: {"job_ids": [...]})
+    The status fields of all jobs are read in one pipelined round trip
+    """
+    try:
+        if not redis_conn:
+            return jsonify({"error": "Queue service not available"}), 503
+
+        job_ids = (request.get_json(silent=True) or {}).get('job_ids')
+        if not isinstance(job_ids, list) or not all(isinstance(job_id, str) for job_id in job_ids):
+            return jsonify({"error": "job_ids must be a list of job ids"}), 400
+        if len(job_ids) > config.JOB_STATUS_BATCH_MAX:
+            return jsonify({"error": f"At most {config.JOB_STATUS_BATCH_MAX} job ids per request"}), 400
+
+        with redis_conn.pipeline(transaction=False) as pipe:
+            for job_id in job_ids:
+                pipe.hmget(Job.key_for(job_id), *JOB_STATUS_FIELDS)
+            all_fields = pipe.execute()
+
+        jobs = []
+        for job_id, fields in zip(job_ids, all_fields):
+            try:
+                jobs.append(job_status_payload(job_id, fields))
+            except NoSuchJobError:
+                jobs.append({"job_id": job_id, "error": "Job not found"})
+
+        return jsonify({"jobs": jobs})
+
+    except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def job_status_etag(payload):
+    """ETag of a job status payload; it only changes when the job moves to another state"""
+    state = f"{payload['status']}|{payload['started_at']}|{payload['ended_at']}"
+    return hashlib.blake2b(state.encode(), digest_size=8).hexdigest()
+
+
+def wait_for_job_change(job_id, etag, timeout):
+    """
+    Block until the job's status payload no longer matches etag, or timeout seconds pass
+    Wakes on the status events workers publish; returns the latest payload either way
+    """
+    deadline = time.monotonic() + timeout
+    pubsub = redis_conn.pubsub(ignore_subscribe_messages=True)
+    # Subscribe before re-reading so a change in between is not missed
+    pubsub.subscribe(config.JOB_EVENTS_CHANNEL_PREFIX + job_id)
+    try:
+        payload = job_status_payload(job_id)
+        while job_status_etag(payload) == etag and payload["status"] not in FINAL_JOB_STATUSES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            pubsub.get_message(timeout=remaining)
+            payload = job_status_payload(job_id)
+        return payload
+    finally:
+        pubsub.close()
+
+
 @app.route('/api/job-status/<job_id>', methods=['GET'])
 def get_job_status(job_id):
     """
     Get status of a queued job
+    With ?wait=<seconds> and the last ETag in If-None-Match, long-polls: the request is held
+    until the job changes state (or the wait runs out) instead of answering at once
     """
     try:
         if not redis_conn:
             return jsonify({"error": "Queue service not available"}), 503
 
-        job = Job.fetch(job_id, connection=redis_conn)
-
-        response = {
-            "job_id": job.id,
-            "status": job.get_status(),
-            "created_at": job.created_at.isoformat() if job.created_at else None,
-            "started_at": job.started_at.isoformat() if job.started_at else None,
-            "ended_at": job.ended_at.isoformat() if job.ended_at else None,
-        }
+        payload = job_status_payload(job_id)
+        etag = job_status_etag(payload)
 
-        # Include result if job is finished
-        if job.is_finished:
-            response["result"] = job.result
-        elif job.is_failed:
-            response["exc_info"] = job.exc_info
+        wait = min(request.args.get('wait', 0, type=float), config.JOB_STATUS_MAX_WAIT_SECONDS)
+        if wait > 0 and request.if_none_match.contains(etag) and payload["status"] not in FINAL_JOB_STATUSES:
+            payload = wait_for_job_change(job_id, etag, wait)
+            etag = job_status_etag(payload)
 
-        return jsonify(response)
+        # Most polls see an unchanged job: answer those with an empty 304 instead of the JSON
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = jsonify(payload)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'  # Browser revalidates with If-None-Match
+        return response
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/api/job-events/<job_id>', methods=['GET'])
+def job_events(job_id):
+    """
+    Server-sent events stream of a job's status, replacing 1-second polling of /api/job-status
+    Each event carries the same JSON as /api/job-status and is sent when workers publish a
+    status change; the stream ends after the job finishes or fails
+    """
+    if not redis_conn:
+        return jsonify({"error": "Queue service not available"}), 503
+
+    def stream():
+        pubsub = redis_conn.pubsub(ignore_subscribe_messages=True)
+        # Subscribe before the first read so a change in between is not missed
+        pubsub.subscribe(config.JOB_EVENTS_CHANNEL_PREFIX + job_id)
+        try:
+            last_status = None
+            while True:
+                payload = job_status_payload(job_id)
+                if payload["status"] != last_status:
+                    last_status = payload["status"]
+                    yield f"data: {app.json.dumps(payload)}\n\n"
+                if last_status in FINAL_JOB_STATUSES:
+                    return
+                # Also re-check on timeout, in case a worker without events picked the job up
+                if pubsub.get_message(timeout=config.JOB_EVENTS_KEEPALIVE_SECONDS) is None:
+                    yield ": keepalive\n\n"
+        except NoSuchJobError:
+            yield f"data: {app.json.dumps({'job_id': job_id, 'error': 'Job not found'})}\n\n"
+        finally:
+            pubsub.close()
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/api/audio/<audio_id>', methods=['GET'])
 def get_audio(audio_id):
     """Serve generated audio file"""
@@ -732,10 +1085,17 @@ def get_audio(audio_id):
         if not audio_path.exists():
             return jsonify({"error": "Audio file not found"}), 404
 
+        # Behind nginx, let it send the file so no Flask thread is tied up streaming it
+        if config.AUDIO_ACCEL_REDIRECT_PREFIX:
+            accel_path = f"{config.AUDIO_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{audio_path.name}"
+            return Response(mimetype='audio/mpeg', headers={'X-Accel-Redirect': accel_path})
+
         return send_file(
             audio_path,
             mimetype='audio/mpeg',
-            as_attachment=False
+            as_attachment=False,
+            conditional=True,  # Range requests (audio seeking) get 206 partial responses
+            max_age=config.FILE_CLEANUP_AGE_HOURS * 3600  # Ids are never reused, so a file does not change until it expires
         )
 
     except Exception as e:
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+WSGI Entry Point for the Interface Server
+
+Exposes the Flask app from interface_server.py as `application` so it can run under a
+production WSGI server instead of the Werkzeug development server used by
+`python server/interface_server.py`.
+
+Usage (from the project root):
+    gunicorn -c server/gunicorn.conf.py server.wsgi:application
+
+Threads matter more than processes here: requests mostly wait on Redis, and every open
+/api/job-events stream holds one thread until its job is done. Set WEB_CONCURRENCY to
+change the number of gunicorn worker processes (see gunicorn.conf.py).
+"""
+
+from server.interface_server import app as application
@@ -10,7 +10,24 @@ Includes boundary tests for the exact 10MB size limit to verify the validation
 logic uses > operator (10MB passes, 10MB+1 fails).
 
 Uses fake file objects to test validation without actual file I/O.
+
+Also checks that job status polling reads only the status fields (get_job_status,
+get_job_status_batch)
+and that old files are swept in the background (cleanup_old_files, start_cleanup_thread).
+Oversized request bodies are checked to be refused with a 413 (request_too_large).
+Uploads are checked to reach Redis in one pipeline (process_comic) and bulk uploads in one
+enqueue_many call (process_comics).
+Job status pushes are checked to end once the job is done (job_events).
+The landing page is checked for ETag revalidation and gzip (index), the voice list
+for cacheable output (list_voices), and audio downloads for the nginx X-Accel-Redirect
+and X-Sendfile handoffs and Range support (get_audio).
 """
+import gzip
+import io
+import json
+import os
+import time
+
 import pytest
 import sys
 from pathlib import Path
@@ -18,7 +35,10 @@ from pathlib import Path
 # Add server directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "server"))
 
-from interface_server import validate_image_upload
+from unittest.mock import patch, MagicMock
+
+from interface_server import validate_image_upload, cleanup_old_files, start_cleanup_thread, app
+from webutil import PeriodicTask
 
 def test_no_file_uploaded():
     """Verifies validation fails when no file is provided"""
@@ -103,7 +123,8 @@ def test_valid_image_file():
 
 def test_various_image_extensions():
     """Verifies all supported image extensions are accepted"""
-    supported_extensions = ["comic.jpg", "comic.jpeg", "comic.png", "comic.gif", "comic.webp"]
+    supported_extensions = ["comic.jpg", "comic.jpeg", "comic.png", "comic.gif", "comic.webp",
+                            "Comic.PNG", "my.comic.v2.jpg"]
 
     for filename in supported_extensions:
         class FakeFile:
@@ -118,3 +139,255 @@ def test_various_image_extensions():
 
         ok, error = validate_image_upload(FakeFile(filename))
         assert ok is True, f"Extension {filename} should be valid"
+
+
+@patch("interface_server.redis_conn")
+@patch("interface_server.Job")
+def test_job_status_reads_only_status_fields(mock_job_cls, mock_redis):
+    """Verifies polling reads status and timestamps via HMGET (not the whole job hash) and returns the result"""
+    mock_redis.hmget.return_value = [b"finished", b"2024-05-01T10:00:00.000000Z", None, None]
+    mock_job_cls.return_value.return_value.return_value = {"success": True}
+
+    response = app.test_client().get("/api/job-status/job-1")
+
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "finished"
+    assert response.get_json()["created_at"] == "2024-05-01T10:00:00"
+    assert response.get_json()["result"] == {"success": True}
+    assert mock_redis.hmget.call_args.args[1:] == ("status", "created_at", "started_at", "ended_at")
+    mock_job_cls.fetch.assert_not_called()
+
+
+@patch("interface_server.redis_conn")
+def test_job_status_unchanged_since_last_poll_returns_304(mock_redis):
+    """Verifies a poll with the previous ETag gets an empty 304 until the job changes state"""
+    mock_redis.hmget.return_value = [b"started", b"2024-05-01T10:00:00.000000Z", b"2024-05-01T10:00:01.000000Z", None]
+    client = app.test_client()
+
+    first = client.get("/api/job-status/job-1")
+    etag = first.headers["ETag"]
+    unchanged = client.get("/api/job-status/job-1", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200 and etag
+    assert unchanged.status_code == 304 and unchanged.data == b""
+
+    mock_redis.hmget.return_value = [b"failed", b"2024-05-01T10:00:00.000000Z", b"2024-05-01T10:00:01.000000Z",
+                                     b"2024-05-01T10:00:05.000000Z"]
+    with patch("interface_server.Job") as mock_job_cls:
+        mock_job_cls.fetch.return_value.exc_info = "Traceback"
+        changed = client.get("/api/job-status/job-1", headers={"If-None-Match": etag})
+
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+@patch("interface_server.redis_conn")
+def test_job_status_long_poll_returns_once_the_job_changes(mock_redis):
+    """Verifies ?wait= holds an unchanged poll until a worker publishes a status change"""
+    queued = [b"queued", b"2024-05-01T10:00:00.000000Z", None, None]
+    started = [b"started", b"2024-05-01T10:00:00.000000Z", b"2024-05-01T10:00:01.000000Z", None]
+    mock_redis.hmget.side_effect = [queued, queued, queued, started]
+    pubsub = mock_redis.pubsub.return_value
+    pubsub.get_message.return_value = {"type": "message", "data": b"job-1"}
+    client = app.test_client()
+
+    etag = client.get("/api/job-status/job-1").headers["ETag"]
+    response = client.get("/api/job-status/job-1?wait=25", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "started"
+    pubsub.subscribe.assert_called_once_with("comic:job-events:job-1")
+    assert pubsub.get_message.call_args.kwargs["timeout"] <= 25
+    pubsub.close.assert_called_once()
+
+
+@patch("interface_server.redis_conn")
+def test_job_status_batch_reads_all_jobs_in_one_pipeline(mock_redis):
+    """Verifies several jobs are answered from one pipelined round trip, with unknown ids flagged"""
+    pipe = mock_redis.pipeline.return_value.__enter__.return_value
+    pipe.execute.return_value = [[b"queued", b"2024-05-01T10:00:00.000000Z", None, None], [None, None, None, None]]
+
+    response = app.test_client().post("/api/job-status-batch", json={"job_ids": ["job-1", "missing"]})
+
+    assert response.get_json()["jobs"] == [
+        {"job_id": "job-1", "status": "queued", "created_at": "2024-05-01T10:00:00", "started_at": None, "ended_at": None},
+        {"job_id": "missing", "error": "Job not found"},
+    ]
+    assert pipe.hmget.call_count == 2
+    pipe.execute.assert_called_once()
+    mock_redis.hmget.assert_not_called()
+    assert app.test_client().post("/api/job-status-batch", json={"job_ids": "job-1"}).status_code == 400
+
+
+def test_cleanup_old_files_removes_only_expired_files(tmp_path):
+    """Verifies files older than an hour are deleted while fresh files stay"""
+    old_file, fresh_file = tmp_path / "old.mp3", tmp_path / "new.mp3"
+    for path in (old_file, fresh_file):
+        path.write_bytes(b"x")
+    two_hours_ago = time.time() - 7200
+    os.utime(old_file, (two_hours_ago, two_hours_ago))
+
+    with patch("interface_server.AUDIO_DIR", tmp_path), patch("interface_server.TEMP_DIR", tmp_path):
+        cleanup_old_files()
+
+    assert not old_file.exists() and fresh_file.exists()
+
+
+@patch("interface_server._cleanup_task", PeriodicTask(lambda: None, "file-cleanup", on_error=print))
+@patch("webutil.threading.Thread")
+def test_start_cleanup_thread_starts_once_per_process(mock_thread):
+    """Verifies repeated calls (one per upload) start only a single background cleanup thread"""
+    assert start_cleanup_thread() is True
+    assert start_cleanup_thread() is False
+    mock_thread.assert_called_once()
+    assert mock_thread.call_args.kwargs["daemon"] is True
+
+
+def test_index_page_is_cached_and_revalidated_by_etag():
+    """Verifies the frontend is served with an ETag and a matching If-None-Match gets a 304"""
+    client = app.test_client()
+
+    first = client.get("/")
+    assert first.status_code == 200 and b"<html" in first.data and first.headers["ETag"]
+
+    second = client.get("/", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304 and not second.data
+
+
+def test_index_page_treats_every_final_job_status_as_terminal():
+    """Verifies the page's poller stops on stopped/canceled jobs, not just finished/failed"""
+    page = app.test_client().get("/").get_data(as_text=True)
+
+    assert "__FINAL_JOB_STATUSES__" not in page
+    assert 'const FINAL_STATUSES = ["finished", "failed", "stopped", "canceled"];' in page
+
+
+def test_audio_is_handed_to_nginx_when_accel_redirect_is_configured(tmp_path):
+    """Verifies get_audio returns an empty X-Accel-Redirect response instead of the file body"""
+    (tmp_path / "abc.mp3").write_bytes(b"ID3fake-mp3")
+    client = app.test_client()
+
+    with patch("interface_server.AUDIO_DIR", tmp_path):
+        direct = client.get("/api/audio/abc")
+        with patch("interface_server.config.AUDIO_ACCEL_REDIRECT_PREFIX", "/internal-audio/"):
+            redirected = client.get("/api/audio/abc")
+
+    assert direct.data == b"ID3fake-mp3" and "X-Accel-Redirect" not in direct.headers
+    assert redirected.headers["X-Accel-Redirect"] == "/internal-audio/abc.mp3"
+    assert redirected.mimetype == "audio/mpeg" and redirected.data == b""
+
+
+def test_audio_range_request_gets_partial_content(tmp_path):
+    """Verifies seeking in the player fetches only the requested bytes of the MP3"""
+    (tmp_path / "abc.mp3").write_bytes(b"ID3fake-mp3")
+
+    with patch("interface_server.AUDIO_DIR", tmp_path):
+        response = app.test_client().get("/api/audio/abc", headers={"Range": "bytes=3-6"})
+
+    assert response.status_code == 206
+    assert response.data == b"fake"
+    assert response.headers["Content-Range"] == "bytes 3-6/11"
+    assert "max-age=3600" in response.headers["Cache-Control"]
+
+
+def test_audio_is_handed_to_the_web_server_when_x_sendfile_is_enabled(tmp_path):
+    """Verifies send_file emits only an X-Sendfile header when USE_X_SENDFILE is on"""
+    (tmp_path / "abc.mp3").write_bytes(b"ID3fake-mp3")
+
+    with patch("interface_server.AUDIO_DIR", tmp_path), patch.dict(app.config, {"USE_X_SENDFILE": True}):
+        response = app.test_client().get("/api/audio/abc")
+
+    assert response.headers["X-Sendfile"] == str(tmp_path / "abc.mp3")
+    assert response.mimetype == "audio/mpeg" and response.data == b""
+
+
+@patch("interface_server.start_cleanup_thread")
+@patch("interface_server.redis_conn", MagicMock())
+@patch("interface_server.default_queue")
+def test_bulk_upload_enqueues_all_pages_in_one_call(mock_queue, _):
+    """Verifies every page becomes one job, in upload order, submitted by a single enqueue_many"""
+    mock_queue.enqueue_many.side_effect = lambda datas: [MagicMock(id=f"job-{i}") for i in range(len(datas))]
+    pages = [(io.BytesIO(f"page{i}".encode()), f"page{i}.png") for i in range(3)]
+
+    response = app.test_client().post("/api/process-comics", data={"images": pages, "translate": "true"})
+
+    assert response.get_json()["job_ids"] == ["job-0", "job-1", "job-2"]
+    mock_queue.enqueue_many.assert_called_once()
+    job_datas = mock_queue.enqueue_many.call_args.args[0]
+    assert [d.kwargs["image_bytes"] for d in job_datas] == [b"page0", b"page1", b"page2"]
+    assert all(d.kwargs["translate"] is True and d.timeout == "10m" for d in job_datas)
+
+
+@patch("interface_server.start_cleanup_thread")
+@patch("interface_server.redis_conn", MagicMock())
+@patch("interface_server.default_queue")
+def test_oversized_request_is_refused_before_reading(mock_queue, _):
+    """Verifies a body over MAX_CONTENT_LENGTH gets a JSON 413 and nothing is enqueued"""
+    with patch.dict(app.config, {"MAX_CONTENT_LENGTH": 1024}):
+        response = app.test_client().post(
+            "/api/process-comic", data={"image": (io.BytesIO(b"x" * 4096), "page.png")}
+        )
+
+    assert response.status_code == 413
+    assert response.get_json() == {"error": "File too large"}
+    mock_queue.enqueue_job.assert_not_called()
+
+
+@patch("interface_server.start_cleanup_thread")
+@patch("interface_server.redis_conn")
+@patch("interface_server.default_queue")
+def test_upload_enqueues_job_in_one_pipeline(mock_queue, mock_redis, _):
+    """Verifies a single upload writes its job through one non-transactional pipeline"""
+    pipe = mock_redis.pipeline.return_value.__enter__.return_value
+
+    response = app.test_client().post("/api/process-comic", data={"image": (io.BytesIO(b"page"), "page.png")})
+
+    job = mock_queue.enqueue_job.call_args.args[0]
+    assert response.get_json()["job_id"] == job.id
+    assert job.kwargs["image_bytes"] == b"page" and job.timeout == 600
+    mock_redis.pipeline.assert_called_once_with(transaction=False)
+    assert mock_queue.enqueue_job.call_args.kwargs["pipeline"] is pipe
+    pipe.execute.assert_called_once()
+
+
+@patch("interface_server.redis_conn")
+@patch("interface_server.Job")
+def test_job_events_stream_pushes_each_status_change_until_finished(mock_job_cls, mock_redis):
+    """Verifies the SSE stream sends one event per status change and closes after the final one"""
+    mock_redis.hmget.side_effect = [[status, b"2024-05-01T10:00:00Z", None, None]
+                                    for status in (b"queued", b"started", b"started", b"finished")]
+    mock_job_cls.return_value.return_value.return_value = {"success": True}
+    pubsub = mock_redis.pubsub.return_value
+    pubsub.get_message.side_effect = [{"data": b"job-1"}, None, {"data": b"job-1"}]
+
+    body = app.test_client().get("/api/job-events/job-1").get_data(as_text=True)
+
+    events = [json.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+    assert [e["status"] for e in events] == ["queued", "started", "finished"]
+    assert events[-1]["result"] == {"success": True}
+    assert ": keepalive" in body
+    pubsub.subscribe.assert_called_once_with("comic:job-events:job-1")
+    pubsub.close.assert_called_once()
+
+
+def test_index_page_is_served_pre_gzipped_when_accepted():
+    """Verifies gzip-capable clients get the precompressed page under its own ETag"""
+    client = app.test_client()
+
+    plain = client.get("/")
+    zipped = client.get("/", headers={"Accept-Encoding": "gzip, deflate"})
+
+    assert zipped.headers["Content-Encoding"] == "gzip" and "Accept-Encoding" in zipped.headers["Vary"]
+    assert gzip.decompress(zipped.data) == plain.data
+    assert zipped.headers["ETag"] != plain.headers["ETag"]
+
+
+def test_voices_endpoint_lists_every_voice_with_its_language():
+    """Verifies /api/voices returns the voice picker entries in order and is cacheable"""
+    response = app.test_client().get("/api/voices")
+    voices = response.get_json()
+
+    assert voices[0] == {"name": "en-US-Neural2-F", "language_code": "en-US", "label": "🎭 Female Voice 1 (US)"}
+    assert {"nl-NL-Standard-A", "en-US-Neural2-F"} <= {v["name"] for v in voices}
+    assert all(v["name"].startswith(v["language_code"]) for v in voices)
+    assert "max-age=3600" in response.headers["Cache-Control"]
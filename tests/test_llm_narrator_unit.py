@@ -7,15 +7,28 @@ audiobook-style narration from comic images.
 Tested functionality:
 - Initialization (requires API key)
 - Base64 image encoding (used for API requests)
+- Downscaling oversized images before upload (_prepare_image)
+- Data URLs labelled with the image's real MIME type (_image_data_url)
 - Prompt generation (with/without panel context)
 - Successful narration with mocked OpenAI responses
 - Error handling when OpenAI API fails (rate limits, network errors)
+- Narration cache by image hash, in memory and on disk with expiry (narrate_panel)
+- Concurrent multi-panel narration keeping panel order (narrate_comic)
+- Several panels per request with JSON output (narrate_panel_group)
+- Batch API submission, polling and ordered result parsing (narrate_comic_batch)
 
 All OpenAI API calls are mocked to avoid costs and ensure fast, deterministic tests.
 """
+import os
+import threading
+import time
+from io import BytesIO
 from unittest.mock import patch, MagicMock
 import pytest
 import base64
+import json
+import re
+from PIL import Image
 from narration.llm_narrator import ComicNarrator, narrate_panel
 
 
@@ -44,6 +57,38 @@ def test_narrator_encode_image_to_base64():
         assert decoded == test_bytes
 
 
+def test_narrator_prepare_image_downscales_only_oversized_images():
+    """Verifies large images shrink to 768px on the short side as JPEG and small ones pass through"""
+    def png(size):
+        buf = BytesIO()
+        Image.new("RGB", size, "white").save(buf, "PNG")
+        return buf.getvalue()
+
+    narrator = ComicNarrator(api_key='test-key')
+    large, small = png((3000, 1500)), png((600, 400))
+
+    prepared = Image.open(BytesIO(narrator._prepare_image(large)))
+    assert prepared.format == "JPEG" and prepared.size == (1536, 768)
+    assert narrator._prepare_image(small) == small
+    assert narrator._prepare_image(b"not an image") == b"not an image"
+
+
+def test_narrator_image_data_url_uses_the_actual_image_type():
+    """Verifies data URLs carry the detected MIME type and decode back to the image bytes"""
+    narrator = ComicNarrator(api_key='test-key')
+    images = {}
+    for fmt in ("PNG", "JPEG", "GIF", "WEBP"):
+        buf = BytesIO()
+        Image.new("RGB", (32, 32), "white").save(buf, fmt)
+        images[fmt] = buf.getvalue()
+
+    for fmt, image_bytes in images.items():
+        header, data = narrator._image_data_url(image_bytes).split(",", 1)
+        assert header == f"data:image/{fmt.lower()};base64"
+        assert base64.b64decode(data) == image_bytes
+    assert narrator._image_data_url(b"unknown").startswith("data:image/jpeg;base64,")
+
+
 def test_narrator_create_prompt_with_panel_context():
     """Verifies prompt generation includes panel context when provided"""
     with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}):
@@ -97,3 +142,153 @@ def test_narrator_narrate_panel_api_error(mock_openai):
         assert result["narration"] == ""
         assert "rate limit" in result["error"].lower()
         assert result["tokens_used"] is None
+
+
+@patch("narration.llm_narrator.OpenAI")
+def test_narrator_reuses_cached_narration_across_instances(mock_openai, tmp_path):
+    """Verifies a repeated panel is served from the cache (memory, then disk) without an API call"""
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = "A dramatic scene unfolds."
+    mock_response.usage.total_tokens = 45
+    create = mock_openai.return_value.chat.completions.create
+    create.return_value = mock_response
+
+    narrator = ComicNarrator(api_key='test-key', cache_dir=str(tmp_path))
+    first = narrator.narrate_panel(b"fake_image", panel_number=1, total_panels=3)
+    again = narrator.narrate_panel(b"fake_image", panel_number=1, total_panels=3)
+    other_position = narrator.narrate_panel(b"fake_image", panel_number=2, total_panels=3)
+    from_disk = ComicNarrator(api_key='test-key', cache_dir=str(tmp_path)).narrate_panel(
+        b"fake_image", panel_number=1, total_panels=3
+    )
+
+    assert create.call_count == 2  # first call and the different panel position only
+    assert first["tokens_used"] == 45 and "cached" not in first
+    for cached in (again, from_disk):
+        assert cached["narration"] == "A dramatic scene unfolds."
+        assert cached["cached"] is True and cached["tokens_used"] == 0
+    assert other_position["tokens_used"] == 45
+
+
+@patch("narration.llm_narrator.OpenAI")
+def test_narrator_disk_cache_expires_old_entries(mock_openai, tmp_path):
+    """Verifies disk cache files past their max age are not served and are swept on the next write"""
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = "A dramatic scene unfolds."
+    mock_response.usage.total_tokens = 45
+    create = mock_openai.return_value.chat.completions.create
+    create.return_value = mock_response
+
+    ComicNarrator(api_key='test-key', cache_dir=str(tmp_path)).narrate_panel(b"old_image")
+    stale = tmp_path / "stale.json"
+    stale.write_text("{}")
+    two_weeks_ago = time.time() - 14 * 24 * 3600
+    for path in tmp_path.iterdir():
+        os.utime(path, (two_weeks_ago, two_weeks_ago))
+
+    narrator = ComicNarrator(api_key='test-key', cache_dir=str(tmp_path))
+    result = narrator.narrate_panel(b"old_image")
+
+    assert create.call_count == 2 and "cached" not in result
+    assert not stale.exists() and len(list(tmp_path.iterdir())) == 1
+
+
+@patch("narration.llm_narrator.OpenAI")
+def test_narrator_narrate_comic_runs_panels_concurrently_in_order(mock_openai):
+    """Verifies panel requests overlap and the combined narration keeps panel order"""
+    barrier = threading.Barrier(3, timeout=5)
+
+    def create(**kwargs):
+        barrier.wait()  # Only passes if all three panel requests are in flight together
+        prompt = kwargs["messages"][0]["content"][0]["text"]
+        response = MagicMock()
+        response.choices[0].message.content = re.search(r"This is panel \d of 3", prompt).group()
+        response.usage.total_tokens = 10
+        return response
+
+    mock_openai.return_value.chat.completions.create.side_effect = create
+
+    narrator = ComicNarrator(api_key='test-key')
+    result = narrator.narrate_comic([b"p1", b"p2", b"p3"])
+
+    assert result["success"] is True
+    assert result["full_narration"].split("\n\n") == [f"This is panel {i} of 3" for i in (1, 2, 3)]
+    assert result["total_tokens"] == 30
+
+
+@patch("narration.llm_narrator.OpenAI")
+def test_narrator_narrate_comic_groups_panels_per_request(mock_openai):
+    """Verifies panels_per_call packs images into one JSON-mode request and splits the reply per panel"""
+    def create(**kwargs):
+        response = MagicMock()
+        response.usage.total_tokens = 100
+        if "response_format" in kwargs:  # panels 1-2 together
+            response.choices[0].message.content = json.dumps(
+                {"panels": [{"panel": 1, "narration": "Panel 1."}, {"panel": 2, "narration": "Panel 2."}]}
+            )
+        else:  # the leftover panel 3 on its own
+            response.choices[0].message.content = "Panel 3."
+        return response
+
+    client = mock_openai.return_value
+    client.chat.completions.create.side_effect = create
+
+    narrator = ComicNarrator(api_key='test-key')
+    result = narrator.narrate_comic([b"p1", b"p2", b"p3"], panels_per_call=2)
+
+    assert client.chat.completions.create.call_count == 2
+    group_call = next(c for c in client.chat.completions.create.call_args_list
+                      if "response_format" in c.kwargs)
+    assert group_call.kwargs["response_format"] == {"type": "json_object"}
+    assert sum(part["type"] == "image_url" for part in group_call.kwargs["messages"][0]["content"]) == 2
+    assert result["full_narration"] == "Panel 1.\n\nPanel 2.\n\nPanel 3."
+    assert result["success"] is True and result["total_tokens"] == 200
+
+
+@patch("narration.llm_narrator.OpenAI")
+def test_narrator_panel_group_maps_out_of_range_numbers_by_position(mock_openai):
+    """Verifies 0-based or non-integer panel numbers in the JSON reply fall back to reply order"""
+    client = mock_openai.return_value
+    client.chat.completions.create.return_value.usage.total_tokens = 50
+    narrator = ComicNarrator(api_key='test-key')
+
+    for numbers in ([0, 1], ["x", 5]):
+        client.chat.completions.create.return_value.choices[0].message.content = json.dumps(
+            {"panels": [{"panel": n, "narration": f"Narration {i}."} for i, n in enumerate(numbers)]}
+        )
+        results, tokens = narrator.narrate_panel_group([b"p4", b"p5"], first_panel_number=4, total_panels=5)
+
+        assert [r["narration"] for r in results] == ["Narration 0.", "Narration 1."]
+        assert all(r["success"] for r in results) and tokens == 50
+
+
+@patch("narration.llm_narrator.time.sleep")
+@patch("narration.llm_narrator.OpenAI")
+def test_narrator_narrate_comic_batch_orders_results_by_panel(mock_openai, mock_sleep):
+    """Verifies panels go out as one JSONL batch and out-of-order output lines map back to panels"""
+    client = mock_openai.return_value
+    client.files.create.return_value.id = "file-in"
+    client.batches.create.return_value = MagicMock(id="batch-1", status="in_progress")
+    client.batches.retrieve.return_value = MagicMock(id="batch-1", status="completed", output_file_id="file-out")
+
+    def output_line(custom_id, content):
+        body = {"choices": [{"message": {"content": content}}], "usage": {"total_tokens": 7}}
+        return json.dumps({"custom_id": custom_id, "response": {"status_code": 200, "body": body}})
+
+    client.files.content.return_value.text = "\n".join([
+        output_line("panel-2", "Second."),
+        json.dumps({"custom_id": "panel-3", "response": {"status_code": 429, "body": {"error": "rate limited"}}}),
+        output_line("panel-1", "First."),
+    ])
+
+    narrator = ComicNarrator(api_key='test-key')
+    result = narrator.narrate_comic_batch([b"p1", b"p2", b"p3"], poll_interval=0)
+
+    uploaded = client.files.create.call_args.kwargs["file"][1].decode().splitlines()
+    assert [json.loads(line)["custom_id"] for line in uploaded] == ["panel-1", "panel-2", "panel-3"]
+    assert client.files.create.call_args.kwargs["purpose"] == "batch"
+    assert client.batches.create.call_args.kwargs["input_file_id"] == "file-in"
+    assert [p["narration"] for p in result["panels"]] == ["First.", "Second.", ""]
+    assert result["full_narration"] == "First.\n\nSecond."
+    assert result["success"] is False and "rate limited" in result["panels"][2]["error"]
+    assert result["total_tokens"] == 14
+
@@ -22,10 +22,10 @@ from workers.tasks import (
     process_tts_task,
 )
 
-@patch("workers.tasks.ComicOCR")
-def test_ocr_task_success(mock_ocr):
+@patch("workers.tasks.get_ocr")
+def test_ocr_task_success(mock_get_ocr):
     """Verifies OCR successfully extracts text from comic image"""
-    instance = mock_ocr.return_value
+    instance = mock_get_ocr.return_value
     instance.extract_text.return_value = {
         "text": "Hello",
         "panel_count": 1,
@@ -44,10 +44,10 @@ def test_ocr_task_success(mock_ocr):
     assert result["confidence"] == 0.95
 
 
-@patch("workers.tasks.ComicOCR")
-def test_ocr_task_failure(mock_ocr):
+@patch("workers.tasks.get_ocr")
+def test_ocr_task_failure(mock_get_ocr):
     """Verifies OCR handles extraction failures gracefully"""
-    instance = mock_ocr.return_value
+    instance = mock_get_ocr.return_value
     instance.extract_text.side_effect = Exception("OCR boom")
 
     result = process_ocr_task(b"fake")
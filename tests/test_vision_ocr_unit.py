@@ -0,0 +1,461 @@
+"""
+Unit tests for the OCR fallback helpers in narration/vision_ocr.py.
+
+Tests the pure-Python / OpenCV helpers used by the OCR extraction path:
+- Coherence scoring and text reordering (TextReorderer)
+- Image enhancement shortcuts (ImagePreprocessor)
+- Speech bubble detection on synthetic pages (SpeechBubbleDetector)
+- Panel and bubble reading order (ComicOCR)
+- Proximity grouping of loose text blocks (ComicOCR.group_text_by_proximity)
+- Expiry of old audio/temp files (cleanup_old_files, start_cleanup_thread)
+- Background MP3 writes served by the audio route (save_audio_async)
+- NDJSON event stream and merged JSON from the legacy process-comic route
+- Cached frontend page with ETag revalidation and gzip (index route)
+- orjson-backed JSON responses (OrjsonProvider)
+- Per-panel TTS synthesis (synthesize_speech_by_panel)
+- The OCR extraction pipeline with a mocked Vision client (ComicOCR._extract_text_with_ocr)
+
+No Google Cloud calls are made; all tests run on synthetic inputs.
+"""
+import gzip
+import io
+import json
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+import cv2
+import numpy as np
+import pytest
+from google.cloud import texttospeech
+
+from narration.vision_ocr import (
+    TextReorderer, SpeechBubbleDetector, ImagePreprocessor, ComicOCR, get_ocr, cleanup_old_files,
+    synthesize_speech_by_panel, start_cleanup_thread, save_audio_async, app, OrjsonProvider, ORJSON_AVAILABLE,
+)
+from webutil import PeriodicTask
+
+
+def make_page(ellipses, size=(600, 800)):
+    """Draw outlined ellipses ((cx, cy), (ax, ay)) on a white page and return PNG bytes"""
+    img = np.full((size[0], size[1], 3), 255, np.uint8)
+    for center, axes in ellipses:
+        cv2.ellipse(img, center, axes, 0, 0, 360, (0, 0, 0), 3)
+    _, buffer = cv2.imencode('.png', img)
+    return buffer.tobytes()
+
+
+def fake_annotation(text, x, y, w, h):
+    """Build an object shaped like a Vision text annotation"""
+    vertices = [SimpleNamespace(x=vx, y=vy) for vx, vy in ((x, y), (x + w, y), (x + w, y + h), (x, y + h))]
+    return SimpleNamespace(description=text, bounding_poly=SimpleNamespace(vertices=vertices))
+
+
+def fake_vision_client(words):
+    """Return a mock Vision client whose text_detection yields the given (text, x, y, w, h) words"""
+    annotations = [fake_annotation(' '.join(w[0] for w in words), 0, 0, 1, 1)]
+    annotations += [fake_annotation(*w) for w in words]
+    client = MagicMock()
+    client.text_detection.return_value = SimpleNamespace(
+        error=SimpleNamespace(message=''), text_annotations=annotations
+    )
+    return client
+
+
+def test_coherence_prefers_question_before_answer():
+    """Verifies a question followed by its answer scores higher than the reverse"""
+    question_first = TextReorderer.calculate_coherence_score(["WHAT DO THEY DO?", "WELL, THEY EAT."])
+    answer_first = TextReorderer.calculate_coherence_score(["WELL, THEY EAT.", "WHAT DO THEY DO?"])
+
+    assert question_first > answer_first
+
+
+def test_coherence_rewards_intact_phrases():
+    """Verifies common phrases in the right word order beat scrambled ones"""
+    intact = TextReorderer.calculate_coherence_score(["For example, they have Thanksgiving."])
+    scrambled = TextReorderer.calculate_coherence_score(["Example for, they have Thanksgiving."])
+
+    assert intact > scrambled
+
+
+def test_reorder_two_sentences_puts_question_first():
+    """Verifies reorder_text swaps two sentences when the answer comes first"""
+    result = TextReorderer.reorder_text("Because it rains. Why are you wet?")
+
+    assert result.startswith("Why are you wet?")
+
+
+def test_reorder_text_is_memoized():
+    """Verifies repeated bubble text is served from the reorder cache"""
+    from narration.vision_ocr import _reorder_text
+
+    text = "Because the sky fell. Why is it dark?"
+    first = TextReorderer.reorder_text(text)
+    hits = _reorder_text.cache_info().hits
+
+    assert TextReorderer.reorder_text(text) == first
+    assert _reorder_text.cache_info().hits == hits + 1
+
+
+def test_reorder_batch_matches_single_calls():
+    """Verifies batch reordering returns one result per input, in order, duplicates included"""
+    texts = ["Because it rains. Why are you wet?", "BOOM!", "Because it rains. Why are you wet?"]
+
+    assert TextReorderer.reorder_batch(texts) == [TextReorderer.reorder_text(t) for t in texts]
+    assert TextReorderer.reorder_batch([]) == []
+
+
+def test_reorder_keeps_ordered_dialogue_in_place():
+    """Verifies only an answer before a question is swapped; other pairs and longer texts are untouched"""
+    for text in ("Nice to meet you. Where are you going?",
+                 "Well, hello there. Nice to meet you.",
+                 "Now listen. The cat is here. How odd!",
+                 "Because it rains. It is cold. Why are you wet?"):
+        assert TextReorderer.reorder_text(text) == text
+
+
+def test_detect_bubbles_drops_duplicate_outlines():
+    """Verifies the inner and outer edge of one thick outline yield a single bubble"""
+    page = make_page([((200, 150), (120, 70)), ((600, 400), (130, 80))])
+
+    for accurate in (False, True):
+        bubbles = SpeechBubbleDetector.detect_bubbles(page, accurate=accurate)
+
+        assert len(bubbles) == 2
+        centers = sorted((b['center_x'], b['center_y']) for b in bubbles)
+        assert abs(centers[0][0] - 200) < 10 and abs(centers[0][1] - 150) < 10
+        assert abs(centers[1][0] - 600) < 10 and abs(centers[1][1] - 400) < 10
+
+
+def test_detect_bubbles_finds_bubbles_inside_panel_frames():
+    """Verifies bubbles nested inside a bordered panel are still detected"""
+    img = np.full((600, 800, 3), 255, np.uint8)
+    cv2.rectangle(img, (10, 10), (790, 590), (0, 0, 0), 4)
+    cv2.ellipse(img, (200, 150), (120, 70), 0, 0, 360, (0, 0, 0), 3)
+    cv2.putText(img, "HELLO", (150, 160), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+
+    bubbles = SpeechBubbleDetector.detect_bubbles_arr(img)
+
+    assert len(bubbles) == 1
+    assert abs(bubbles[0]['center_x'] - 200) < 10 and abs(bubbles[0]['center_y'] - 150) < 10
+
+
+def test_contour_areas_and_rects_match_opencv():
+    """Verifies the batched shoelace areas and bounding rects equal cv2.contourArea / boundingRect"""
+    from narration.vision_ocr import _contour_areas_and_rects
+
+    noise = (np.random.default_rng(0).random((200, 300)) > 0.7).astype(np.uint8) * 255
+    contours, _ = cv2.findContours(noise, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+
+    areas, rects = _contour_areas_and_rects(contours)
+
+    assert np.allclose(areas, [cv2.contourArea(c) for c in contours])
+    assert rects.tolist() == [list(cv2.boundingRect(c)) for c in contours]
+    assert _contour_areas_and_rects(())[0].size == 0
+
+
+def test_panels_sorted_in_reading_order():
+    """Verifies panels are read row by row, left to right, despite ragged tops"""
+    panels = [
+        {'x': 420, 'y': 330, 'width': 380, 'height': 300, 'name': 'bottom-right'},
+        {'x': 0, 'y': 10, 'width': 400, 'height': 300, 'name': 'top-left'},
+        {'x': 0, 'y': 320, 'width': 400, 'height': 300, 'name': 'bottom-left'},
+        {'x': 420, 'y': 0, 'width': 380, 'height': 310, 'name': 'top-right'},
+    ]
+
+    ordered = ComicOCR().sort_panels_reading_order(panels)
+
+    assert [p['name'] for p in ordered] == ['top-left', 'top-right', 'bottom-left', 'bottom-right']
+
+
+def test_bubbles_sorted_in_reading_order():
+    """Verifies bubbles at the same height are read left to right before lower ones"""
+    def bubble(x, y, name):
+        return {'x': x, 'y': y, 'width': 100, 'height': 60,
+                'center_x': x + 50, 'center_y': y + 30, 'name': name}
+
+    bubbles = [bubble(300, 200, 'c'), bubble(250, 10, 'b'), bubble(10, 20, 'a')]
+
+    ordered = ComicOCR().sort_bubbles_in_panel(bubbles)
+
+    assert [b['name'] for b in ordered] == ['a', 'b', 'c']
+    assert ComicOCR().sort_bubbles_in_panel([]) == []
+
+
+def test_group_text_by_proximity_chains_neighbours():
+    """Verifies words close in both axes are grouped transitively, distant ones stay apart"""
+    def word(x, y, text):
+        return {'text': text, 'x': x, 'y': y, 'width': 40, 'height': 20}
+
+    blocks = [
+        word(0, 0, 'HELLO'), word(60, 0, 'THERE'), word(120, 0, 'FRIEND'),  # chained left to right
+        word(0, 25, 'HOW'),                                                    # line below
+        word(600, 400, 'BOOM'),                                                # far away
+        word(0, 200, 'LATER'),                                                 # close horizontally only
+    ]
+
+    groups = ComicOCR().group_text_by_proximity(blocks)
+
+    assert sorted(sorted(t['text'] for t in g) for g in groups) == [
+        ['BOOM'], ['FRIEND', 'HELLO', 'HOW', 'THERE'], ['LATER'],
+    ]
+    assert ComicOCR().group_text_by_proximity([]) == []
+
+
+def test_enhance_image_skips_high_contrast_pages():
+    """Verifies already high-contrast pages pass through untouched and others come back as JPEG"""
+    high_contrast = np.zeros((100, 100), np.uint8)
+    high_contrast[:, 50:] = 255
+    _, buffer = cv2.imencode('.png', high_contrast)
+    original = buffer.tobytes()
+
+    assert ImagePreprocessor.enhance_image(original) == original
+
+    flat = np.full((100, 100), 128, np.uint8)
+    flat[40:60, 40:60] = 140
+    _, buffer = cv2.imencode('.png', flat)
+
+    assert ImagePreprocessor.enhance_image(buffer.tobytes())[:2] == b'\xff\xd8'
+    assert ImagePreprocessor.enhance_image(original, aggressive=True)[:2] == b'\xff\xd8'
+
+
+@patch("narration.vision_ocr.get_vision_client")
+def test_extract_text_with_ocr_decodes_image_once(mock_get_client):
+    """Verifies the OCR path decodes the page once and reads bubble text from the Vision result"""
+    mock_get_client.return_value = fake_vision_client([
+        ('HELLO', 140, 140, 50, 20), ('THERE!', 200, 140, 60, 20),
+    ])
+    page = make_page([((200, 150), (120, 70)), ((600, 400), (130, 80))])
+
+    with patch("narration.vision_ocr.cv2.imdecode", wraps=cv2.imdecode) as imdecode:
+        result = ComicOCR()._extract_text_with_ocr(page, preprocess=True)
+
+    assert imdecode.call_count == 1
+    assert "HELLO THERE!" in result['text']
+    assert result['text_blocks'][0] == {'text': 'HELLO', 'x': 140, 'y': 140, 'width': 50, 'height': 20,
+                                        'confidence': 1.0}
+
+
+@patch("narration.vision_ocr.get_vision_client")
+def test_extract_text_batch_chunks_vision_requests(mock_get_client):
+    """Verifies pages are sent to Vision in batches of 16 and results keep page order"""
+    def response(word):
+        return fake_vision_client([(word, 140, 140, 50, 20)]).text_detection.return_value
+
+    client = MagicMock()
+    client.batch_annotate_images.side_effect = lambda requests: SimpleNamespace(
+        responses=[response(f"PAGE{i}") for i in range(len(requests))]
+    )
+    mock_get_client.return_value = client
+    pages = [make_page([((200, 150), (120, 70))], size=(300, 400))] * 17
+
+    results = ComicOCR().extract_text_batch(pages, preprocess=False)
+
+    assert [len(c.kwargs['requests']) for c in client.batch_annotate_images.call_args_list] == [16, 1]
+    assert len(results) == 17
+    assert "PAGE15" in results[15]['text'] and "PAGE0" in results[16]['text']
+
+
+@patch("narration.vision_ocr.get_vision_client")
+def test_extract_text_batch_keeps_other_pages_when_one_fails(mock_get_client):
+    """Verifies a Vision error on one page becomes that page's error entry, not a failed batch"""
+    ok = fake_vision_client([("HELLO", 140, 140, 50, 20)]).text_detection.return_value
+    failed = SimpleNamespace(error=SimpleNamespace(message='Bad image data'), text_annotations=[])
+    client = MagicMock()
+    client.batch_annotate_images.return_value = SimpleNamespace(responses=[ok, failed, ok])
+    mock_get_client.return_value = client
+    pages = [make_page([((200, 150), (120, 70))], size=(300, 400))] * 3
+
+    results = ComicOCR().extract_text_batch(pages, preprocess=False)
+
+    assert "HELLO" in results[0]['text'] and "HELLO" in results[2]['text']
+    assert results[1]['text'] == "" and results[1]['error'] == "Vision API Error: Bad image data"
+
+
+def test_group_into_lines_splits_on_vertical_overlap():
+    """Verifies blocks overlapping the current line by over half their height share its id"""
+    from narration.vision_ocr import _group_into_lines, _line_ids
+
+    tops = np.array([0, 4, 30, 33, 70])
+    heights = np.array([20, 20, 20, 20, 20])
+
+    assert _group_into_lines(tops, heights).tolist() == [0, 0, 1, 1, 2]
+    assert _line_ids(tops.tolist(), heights.tolist()).tolist() == [0, 0, 1, 1, 2]
+
+
+def test_texts_in_bubbles_matches_per_pair_check():
+    """Verifies the vectorized membership mask agrees with is_text_in_bubble for every pair"""
+    bubbles = [{'x': 0, 'y': 0, 'width': 100, 'height': 50}, {'x': 90, 'y': 40, 'width': 60, 'height': 60}]
+    texts = [{'x': x, 'y': y, 'width': 20, 'height': 10}
+             for x in range(-40, 200, 17) for y in range(-30, 130, 13)]
+    centers = np.array([(t['x'] + 10, t['y'] + 5) for t in texts], dtype=float)
+
+    mask = SpeechBubbleDetector.texts_in_bubbles(centers, SpeechBubbleDetector.bubble_bounds_array(bubbles))
+
+    expected = [[SpeechBubbleDetector.is_text_in_bubble(t, b) for b in bubbles] for t in texts]
+    assert mask.tolist() == expected
+
+
+def test_points_in_rects_matches_is_text_in_panel():
+    """Verifies the vectorized text-to-panel mask agrees with is_text_in_panel, edges included"""
+    from narration.vision_ocr import _points_in_rects
+
+    panels = [{'x': 0, 'y': 0, 'width': 100, 'height': 80}, {'x': 100, 'y': 0, 'width': 60, 'height': 80}]
+    texts = [{'x': x, 'y': y} for x in range(-10, 180, 10) for y in range(-10, 100, 10)]
+    rects = np.array([(p['x'], p['y'], p['x'] + p['width'], p['y'] + p['height']) for p in panels], dtype=float)
+
+    mask = _points_in_rects(np.array([(t['x'], t['y']) for t in texts], dtype=float), rects)
+
+    assert mask.tolist() == [[ComicOCR.is_text_in_panel(t, p) for p in panels] for t in texts]
+
+
+def test_get_ocr_returns_shared_instance():
+    """Verifies get_ocr builds one ComicOCR and hands the same object to every caller"""
+    ocr = get_ocr()
+
+    assert isinstance(ocr, ComicOCR)
+    assert get_ocr() is ocr
+
+
+def test_assign_texts_to_bubbles_picks_first_containing_bubble():
+    """Verifies each text goes to the first bubble containing it, and -1 when outside all bubbles"""
+    bounds = SpeechBubbleDetector.bubble_bounds_array(
+        [{'x': 0, 'y': 0, 'width': 100, 'height': 50}, {'x': 90, 'y': 40, 'width': 60, 'height': 60}]
+    )
+    centers = np.array([[50, 25], [95, 45], [140, 90], [500, 500]], dtype=float)
+
+    assert SpeechBubbleDetector.assign_texts_to_bubbles(centers, bounds).tolist() == [0, 0, 1, -1]
+    assert SpeechBubbleDetector.assign_texts_to_bubbles(centers, np.empty((0, 4))).tolist() == [-1] * 4
+
+
+def test_cleanup_old_files_removes_only_expired_files(tmp_path):
+    """Verifies files older than an hour are deleted while fresh files and subdirectories stay"""
+    audio_dir, temp_dir = tmp_path / "audio", tmp_path / "temp"
+    audio_dir.mkdir()
+    temp_dir.mkdir()
+    old_audio, fresh_audio, old_temp = audio_dir / "old.mp3", audio_dir / "new.mp3", temp_dir / "old.png"
+    for path in (old_audio, fresh_audio, old_temp):
+        path.write_bytes(b"x")
+    (temp_dir / "subdir").mkdir()
+    two_hours_ago = time.time() - 7200
+    os.utime(old_audio, (two_hours_ago, two_hours_ago))
+    os.utime(old_temp, (two_hours_ago, two_hours_ago))
+
+    with patch("narration.vision_ocr.AUDIO_DIR", audio_dir), patch("narration.vision_ocr.TEMP_DIR", temp_dir):
+        cleanup_old_files()
+
+    assert not old_audio.exists() and not old_temp.exists()
+    assert fresh_audio.exists() and (temp_dir / "subdir").is_dir()
+
+
+@patch("narration.vision_ocr._cleanup_task", PeriodicTask(lambda: None, "file-cleanup", on_error=print))
+@patch("webutil.threading.Thread")
+def test_start_cleanup_thread_starts_once_per_process(mock_thread):
+    """Verifies repeated calls (one per request) start only a single background cleanup thread"""
+    assert start_cleanup_thread() is True
+    assert start_cleanup_thread() is False
+    mock_thread.assert_called_once()
+    assert mock_thread.call_args.kwargs["daemon"] is True
+
+
+@patch("narration.vision_ocr.get_tts_client")
+def test_synthesize_speech_by_panel_joins_panels_in_order(mock_get_client):
+    """Verifies each panel is synthesized separately and the audio is joined in reading order"""
+    client = MagicMock()
+    client.synthesize_speech.side_effect = lambda input, voice, audio_config: SimpleNamespace(
+        audio_content=input.text.split(']')[0].encode()
+    )
+    mock_get_client.return_value = client
+    audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
+    text = "[Panel 1]\nHello.\n[Panel 2]\nHi!\n[Panel 3]\nBye."
+
+    audio = synthesize_speech_by_panel(text, texttospeech.VoiceSelectionParams(language_code="en-US"), audio_config)
+
+    assert audio == b"[Panel 1[Panel 2[Panel 3"
+    assert client.synthesize_speech.call_count == 3
+
+
+def test_index_page_is_cached_and_revalidated_by_etag():
+    """Verifies the frontend is served with an ETag and a matching If-None-Match gets a 304"""
+    client = app.test_client()
+
+    first = client.get("/")
+    assert first.status_code == 200 and b"<html" in first.data
+    assert first.headers["ETag"] and "max-age=3600" in first.headers["Cache-Control"]
+
+    second = client.get("/", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304 and not second.data
+
+
+def test_index_page_is_gzipped_when_accepted():
+    """Verifies gzip-capable clients get the pre-compressed page under its own ETag"""
+    client = app.test_client()
+
+    plain = client.get("/")
+    zipped = client.get("/", headers={"Accept-Encoding": "gzip, deflate"})
+
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(zipped.data) == plain.data
+    assert zipped.headers["ETag"] != plain.headers["ETag"]
+    assert "Accept-Encoding" in zipped.headers["Vary"]
+
+
+@pytest.mark.skipif(not ORJSON_AVAILABLE, reason="orjson not installed")
+def test_orjson_provider_serializes_numpy_payloads():
+    """Verifies jsonify output round-trips and NumPy values need no manual conversion"""
+    provider = OrjsonProvider(app)
+    payload = {"text": "Hëllo", "count": np.int64(3), "centers": np.array([[1.5, 2.0]])}
+
+    response = provider.response(payload)
+
+    assert response.mimetype == "application/json"
+    assert provider.loads(response.get_data()) == {"text": "Hëllo", "count": 3, "centers": [[1.5, 2.0]]}
+
+
+def test_saved_audio_is_served_once_the_background_write_finishes(tmp_path):
+    """Verifies the audio route waits for a pending write instead of returning 404"""
+    with patch("narration.vision_ocr.AUDIO_DIR", tmp_path):
+        audio_id = save_audio_async(b"ID3fake-mp3")
+        response = app.test_client().get(f"/api/audio/{audio_id}")
+
+        assert response.status_code == 200
+        assert response.data == b"ID3fake-mp3"
+        assert [p.name for p in tmp_path.iterdir()] == [f"{audio_id}.mp3"]
+
+
+def test_failed_background_audio_write_is_logged_and_cleaned_up(tmp_path, capsys):
+    """Verifies a failed write leaves no .part file behind, is logged, and the route returns 404"""
+    with patch("narration.vision_ocr.AUDIO_DIR", tmp_path), \
+            patch("narration.vision_ocr.os.replace", side_effect=OSError("No space left on device")):
+        audio_id = save_audio_async(b"ID3fake-mp3")
+        response = app.test_client().get(f"/api/audio/{audio_id}")
+
+    assert response.status_code == 404
+    assert list(tmp_path.iterdir()) == []
+    assert "No space left on device" in capsys.readouterr().out
+
+
+@patch("narration.vision_ocr.save_audio_async", return_value="abc")
+@patch("narration.vision_ocr.synthesize_speech_by_panel", return_value=b"mp3")
+@patch("narration.vision_ocr.get_tts_client")
+@patch("narration.vision_ocr.get_ocr")
+def test_process_comic_streams_ndjson_events_or_merged_json(mock_get_ocr, *_):
+    """Verifies NDJSON clients get text, audio and done events in order and others the same data as one object"""
+    mock_get_ocr.return_value.extract_text.return_value = {
+        "text": "[Panel 1]\nHello!", "panel_count": 1, "bubble_count": 1, "text_blocks": [{}], "confidence": 0.9
+    }
+    client = app.test_client()
+
+    def post(**kwargs):
+        return client.post("/api/process-comic", data={"image": (io.BytesIO(b"img"), "page.png")}, **kwargs)
+
+    streamed = post(headers={"Accept": "application/x-ndjson"})
+    events = [json.loads(line) for line in streamed.get_data(as_text=True).splitlines()]
+    assert streamed.mimetype == "application/x-ndjson"
+    assert [e["event"] for e in events] == ["text", "audio", "done"]
+    assert events[0]["extracted_text"] == "[Panel 1]\nHello!" and events[1]["audio_url"] == "/api/audio/abc"
+
+    merged = post().get_json()
+    assert merged["success"] is True and "event" not in merged
+    assert merged["audio_url"] == "/api/audio/abc" and merged["panel_count"] == 1 and merged["text_blocks"] == 1
@@ -10,6 +10,7 @@ import os
 import subprocess
 import logging
 import sys
+import threading
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -34,6 +35,14 @@ if "pytest" in sys.modules:
     def is_translation_available(*args, **kwargs):
         return True
 
+    def get_translator():
+        """No in-process model under pytest."""
+        return None
+
+    def translation_device():
+        """Always the CPU under pytest."""
+        return "-1"
+
     # Skip loading real model paths
     MODEL_PATH = None
     BPE_MODEL_PATH = None
@@ -53,11 +62,81 @@ else:
     BPE_MODEL_PATH = os.path.join(BASE_DIR, "bpe.model")
     TRANSLATE_SCRIPT = os.path.join(BASE_DIR, "translate.py")
 
+    # ───────────────────────────────────────────────────────────────────────────
+    # In-process backend: the checkpoint is loaded once per process instead of by
+    # a translate.py + onmt_translate subprocess pair on every call
+    # ───────────────────────────────────────────────────────────────────────────
+
+    def translation_device():
+        """OpenNMT -gpu value for the in-process model, using translate.py's device rule."""
+        try:
+            from model.translate import gpu_device
+        except ImportError:
+            return "-1"
+        return gpu_device()
+
+    class InProcessTranslator:
+        """OpenNMT model and SentencePiece BPE model, loaded once and kept in memory."""
+
+        def __init__(self):
+            import sentencepiece as spm
+            import onmt.opts as opts
+            from onmt.inference_engine import InferenceEnginePY
+            from onmt.utils.parse import ArgumentParser
+
+            self.sp = spm.SentencePieceProcessor(model_file=BPE_MODEL_PATH)
+
+            # Same options translate.py passes to onmt_translate (GPU when CUDA is available)
+            parser = ArgumentParser()
+            opts.translate_opts(parser)
+            opt = parser.parse_args([
+                "-model", MODEL_PATH, "-src", "dummy", "-replace_unk",
+                "-gpu", translation_device(), "-batch_size", "64"
+            ])
+            ArgumentParser.validate_translate_opts(opt)
+            ArgumentParser._get_all_transform_translate(opt)
+            ArgumentParser._validate_transforms_opts(opt)
+            ArgumentParser.validate_translate_opts_dynamic(opt)
+            self.engine = InferenceEnginePY(opt)
+            self.lock = threading.Lock()  # the engine is not safe to call concurrently
+
+        def translate_lines(self, lines):
+            """BPE-encode, translate and decode a list of sentences in one batch."""
+            src = [" ".join(pieces) for pieces in self.sp.encode(lines, out_type=str)]
+            with self.lock:
+                _, preds = self.engine.infer_list(src)
+            return self.sp.decode([best[0].split() for best in preds])
+
+    _translator = None
+    _translator_failed = False
+    _translator_lock = threading.Lock()
+
+    def get_translator():
+        """
+        Get the shared InProcessTranslator, loading it on first use.
+
+        Returns None when OpenNMT or the model files are unavailable, in which case
+        translate_text falls back to running translate.py in a subprocess.
+        """
+        global _translator, _translator_failed
+
+        if _translator is None and not _translator_failed:
+            with _translator_lock:
+                if _translator is None and not _translator_failed:
+                    try:
+                        _translator = InProcessTranslator()
+                        logger.info("Loaded OpenNMT model in process")
+                    except Exception as e:
+                        _translator_failed = True
+                        logger.warning(f"In-process translation unavailable, using translate.py: {e}")
+        return _translator
+
     def translate_text(text_or_list, src_lang="en", tgt_lang="nl"):
         """
         Translate text using the fine-tuned OpenNMT model (English → Dutch).
 
-        Wraps the original translate.py script for compatibility.
+        Uses the in-process model when it can be loaded; otherwise wraps the original
+        translate.py script for compatibility.
         """
 
         is_single = isinstance(text_or_list, str)
@@ -87,6 +166,34 @@ else:
 
         logger.info(f"Prepared {len(all_lines)} lines for translation")
 
+        translated_lines = None
+        translator = get_translator()
+        if translator is not None:
+            try:
+                translated_lines = translator.translate_lines(all_lines)
+            except Exception as e:
+                logger.warning(f"In-process translation failed, using translate.py: {e}")
+
+        if translated_lines is None:
+            translated_lines = _translate_lines_subprocess(all_lines)
+
+        if len(translated_lines) != len(all_lines):
+            logger.warning(
+                f"Expected {len(all_lines)} translated lines, got {len(translated_lines)}"
+            )
+
+        # Rebuild per-text structure
+        translations = []
+        idx = 0
+        for count in line_counts:
+            block = "\n\n".join(translated_lines[idx : idx + count])
+            translations.append(block)
+            idx += count
+
+        return translations[0] if is_single else translations
+
+    def _translate_lines_subprocess(all_lines):
+        """Translate lines by running translate.py (and onmt_translate) in a subprocess."""
         results_file = os.path.join(BASE_DIR, "results.txt")
 
         try:
@@ -123,20 +230,7 @@ else:
                     if line.startswith("NL:"):
                         translated_lines.append(line[3:].strip())
 
-            if len(translated_lines) != len(all_lines):
-                logger.warning(
-                    f"Expected {len(all_lines)} translated lines, got {len(translated_lines)}"
-                )
-
-            # Rebuild per-text structure
-            translations = []
-            idx = 0
-            for count in line_counts:
-                block = "\n\n".join(translated_lines[idx : idx + count])
-                translations.append(block)
-                idx += count
-
-            return translations[0] if is_single else translations
+            return translated_lines
 
         finally:
             # translate.py already handles cleanup
@@ -0,0 +1,121 @@
+"""
+Shared HTTP helpers for the two Flask servers
+
+Used by server/interface_server.py and narration/vision_ocr.py. Only Flask and the
+standard library are imported here (orjson optionally), so the interface server can
+share this code without pulling in OpenCV or Google Cloud.
+
+Provides:
+    - OrjsonProvider: orjson-backed Flask JSON provider (NumPy values, naive datetimes as UTC)
+    - remove_old_files(): Delete expired files from a set of directories
+    - PeriodicTask: Run a function periodically in one daemon thread per process
+    - StaticPage: Fixed HTML page served pre-gzipped with ETag revalidation
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+
+from flask import Response, request
+from flask.json.provider import DefaultJSONProvider
+
+# orjson is optional: it speeds up jsonify(), stdlib json is used otherwise
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson; also serializes NumPy arrays and scalars"""
+
+    OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+               if ORJSON_AVAILABLE else 0)
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.OPTIONS), mimetype=self.mimetype
+        )
+
+
+def remove_old_files(directories, max_age_seconds):
+    """Remove regular files last modified more than max_age_seconds ago from directories"""
+    cutoff = time.time() - max_age_seconds
+    for directory in directories:
+        # scandir entries come with their type (and stat on some platforms) from the directory read
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file(follow_symlinks=False) and entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                        os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass  # Removed concurrently by another process
+
+
+class PeriodicTask:
+    """
+    Call func every interval seconds in a daemon thread.
+
+    start() is safe to call on every request: only the first call in each process starts
+    a thread (threads do not survive a fork, hence the pid check). Exceptions raised by
+    func are passed to on_error and the loop keeps going.
+    """
+
+    def __init__(self, func, name, on_error):
+        self.func = func
+        self.name = name
+        self.on_error = on_error
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def start(self, interval):
+        """Start the thread unless this process already has one; returns True if started"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return False
+            self._pid = os.getpid()
+
+        def run():
+            while True:
+                try:
+                    self.func()
+                except Exception as e:
+                    self.on_error(e)
+                time.sleep(interval)
+
+        threading.Thread(target=run, name=self.name, daemon=True).start()
+        return True
+
+
+class StaticPage:
+    """HTML page without template variables, encoded and gzipped once and revalidated by ETag"""
+
+    def __init__(self, html, max_age):
+        self.body = html.encode('utf-8')
+        self.body_gzip = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.etag = hashlib.sha1(self.body).hexdigest()
+        self.max_age = max_age
+
+    def response(self):
+        """Response for the current request (gzipped if accepted, 304 if the ETag matches)"""
+        if request.accept_encodings['gzip']:
+            response = Response(self.body_gzip, mimetype='text/html')
+            response.content_encoding = 'gzip'
+            response.set_etag(self.etag + '-gzip')  # each encoding needs its own ETag
+        else:
+            response = Response(self.body, mimetype='text/html')
+            response.set_etag(self.etag)
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        return response.make_conditional(request)
@@ -28,7 +28,7 @@ import logging
 
 # Import the OCR processing logic from the narration module
 from narration.vision_ocr import (
-    ComicOCR,
+    get_ocr,
     setup_credentials,
     AUDIO_DIR,
     TEMP_DIR,
@@ -59,7 +59,7 @@ def process_ocr_task(image_bytes, preprocess=True):
     print(f"[WORKER] Processing OCR task (preprocess={preprocess})")
 
     try:
-        ocr = ComicOCR()
+        ocr = get_ocr()
         result = ocr.extract_text(image_bytes, preprocess=preprocess)
 
         narration_mode = result.get('narration_mode', 'ocr')
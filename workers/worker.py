@@ -43,10 +43,58 @@ import config
 # Import tasks module to ensure it's loaded before worker starts
 # This helps RQ find the task functions
 from workers import tasks
+from translation.translator import get_translator, translation_device
+
+# Build the shared ComicOCR before forking so every work horse inherits it
+tasks.get_ocr()
+
+# Same for the translation model on CPU, so a job does not reload the checkpoint.
+# A CUDA context does not survive fork, so a GPU model is only loaded in a
+# process that runs jobs itself (see SimpleWorker below).
+GPU_TRANSLATION = tasks.is_translation_available() and translation_device() != "-1"
+if tasks.is_translation_available() and not GPU_TRANSLATION:
+    get_translator()
 
 # Connect to Redis
 redis_conn = Redis(host=config.REDIS_HOST, port=config.REDIS_PORT, db=config.REDIS_DB)
 
+
+class JobEventsMixin:
+    """
+    Publish the job id on its events channel whenever RQ has stored a new status
+    (started, finished, failed) so the interface server can push it over SSE.
+    RQ's on_success/on_failure callbacks run before the status is saved, hence the hooks here.
+    """
+
+    def publish_job_event(self, job):
+        try:
+            self.connection.publish(config.JOB_EVENTS_CHANNEL_PREFIX + job.id, job.id)
+        except Exception as e:
+            print(f"⚠️  Could not publish status event for job {job.id}: {e}")
+
+    def prepare_job_execution(self, job, *args, **kwargs):
+        super().prepare_job_execution(job, *args, **kwargs)
+        self.publish_job_event(job)
+
+    def handle_job_success(self, job, *args, **kwargs):
+        super().handle_job_success(job, *args, **kwargs)
+        self.publish_job_event(job)
+
+    def handle_job_failure(self, job, *args, **kwargs):
+        super().handle_job_failure(job, *args, **kwargs)
+        self.publish_job_event(job)
+
+
+class EventWorker(JobEventsMixin, Worker):
+    pass
+
+
+if SimpleWorker is not None:
+    class EventSimpleWorker(JobEventsMixin, SimpleWorker):
+        pass
+else:
+    EventSimpleWorker = None
+
 # List of queues to listen to (in order of priority)
 listen = ['default', 'ocr', 'tts']
 
@@ -67,7 +115,8 @@ if __name__ == '__main__':
         sys.exit(1)
 
     env_worker = os.environ.get("RQ_WORKER_CLASS", "").strip().lower()
-    default_to_simple = platform.system() == "Darwin"
+    # Prefork work horses cannot use a CUDA context, so run GPU translation unforked
+    default_to_simple = platform.system() == "Darwin" or GPU_TRANSLATION
 
     if env_worker not in {"", "worker", "simple"}:
         print(f"⚠️  Unknown RQ_WORKER_CLASS='{env_worker}'. Falling back to default.")
@@ -81,17 +130,21 @@ if __name__ == '__main__':
     else:
         use_simple_worker = default_to_simple
 
-    if use_simple_worker and SimpleWorker is None:
+    if use_simple_worker and EventSimpleWorker is None:
         print("⚠️  SimpleWorker not available in this RQ version. Using standard Worker instead.")
         use_simple_worker = False
 
-    worker_cls = SimpleWorker if use_simple_worker else Worker
+    worker_cls = EventSimpleWorker if use_simple_worker else EventWorker
     worker_mode = "SimpleWorker (no fork)" if use_simple_worker else "Worker (prefork)"
 
     print(f"✓ Listening to queues: {', '.join(listen)}")
     print(f"✓ Worker class: {worker_mode}")
     if use_simple_worker:
         print("  ℹ️  SimpleWorker avoids macOS fork safety crashes. Set RQ_WORKER_CLASS=worker to force prefork mode.")
+        if GPU_TRANSLATION:
+            get_translator()
+    elif GPU_TRANSLATION:
+        print("  ℹ️  Prefork mode with CUDA: each work horse loads the translation model itself.")
     print(f"✓ Worker is ready to process tasks")
     print("="*70 + "\n")
 